@@ -0,0 +1,5 @@
+"""
+    pdf2image benchmark suite
+
+    Run with `python -m benchmarks` from the repository root.
+"""
@@ -0,0 +1,118 @@
+"""
+    Command line entry point, run `python -m benchmarks --help`
+"""
+
+import argparse
+import sys
+
+from . import baseline
+from .harness import load_benchmarks, run
+
+
+def _report(result):
+    if "skipped" in result:
+        print(f"{result['id']:<60} skipped: {result['skipped']}")
+        return
+    line = (
+        f"{result['id']:<60} {result['median'] * 1000:10.3f} ms"
+        f" +- {result['stddev'] * 1000:8.3f} ms"
+    )
+    if result["memory"]:
+        line += " peak {:.1f} MiB (poppler {:.1f} MiB)".format(
+            result["memory"]["peak_rss"] / 2**20,
+            result["memory"]["peak_children_rss"] / 2**20,
+        )
+    print(line)
+
+
+def _run(args):
+    load_benchmarks()
+    results = run(
+        args.pattern,
+        repeat=args.repeat,
+        min_time=args.min_time,
+        memory=args.memory,
+        report=_report,
+    )
+    if args.save:
+        baseline.save(args.save, results)
+    return 0
+
+
+def _compare(args):
+    base, current = baseline.load(args.base), baseline.load(args.current)
+    for key in baseline.fingerprint_differences(base, current):
+        print(
+            f"warning: {key} differs: {base['fingerprint'].get(key)}"
+            f" -> {current['fingerprint'].get(key)}"
+        )
+    rows = baseline.compare(
+        base,
+        current,
+        threshold=args.threshold,
+        alpha=args.alpha,
+        memory_threshold=args.memory_threshold,
+    )
+    baseline.print_comparison(rows)
+    regressions = [row for row in rows if row["status"] == "regression"]
+    print(f"{len(rows)} cases compared, {len(regressions)} regressions")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command")
+
+    run_parser = commands.add_parser("run", help="Run the benchmarks")
+    run_parser.add_argument(
+        "-k", dest="pattern", help="Only run cases whose id contains this string"
+    )
+    run_parser.add_argument("--repeat", type=int, default=5, help="Samples per case")
+    run_parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.2,
+        help="Minimum duration of a sample in seconds",
+    )
+    run_parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="Also measure peak memory, each case runs once more in a fresh process",
+    )
+    run_parser.add_argument("--save", help="Write the results to this JSON baseline")
+    run_parser.set_defaults(func=_run)
+
+    compare_parser = commands.add_parser(
+        "compare", help="Compare two baselines, exits with 1 on regressions"
+    )
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.05,
+        help="Relative slowdown to report, defaults to 0.05",
+    )
+    compare_parser.add_argument(
+        "--alpha",
+        type=float,
+        default=0.05,
+        help="Significance level of Welch's t-test, defaults to 0.05",
+    )
+    compare_parser.add_argument(
+        "--memory-threshold",
+        type=float,
+        default=0.10,
+        help="Relative peak memory increase to report, defaults to 0.10",
+    )
+    compare_parser.set_defaults(func=_compare)
+
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
+        return 2
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
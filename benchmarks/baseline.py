@@ -0,0 +1,195 @@
+"""
+    Save benchmark results as JSON baselines and compare two of them
+"""
+
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Dict, List
+
+from pdf2image.pdf2image import _get_poppler_version
+
+FORMAT_VERSION = 1
+
+
+def fingerprint() -> Dict:
+    """Describe the machine and the software versions the benchmarks ran with"""
+    poppler = {}
+    for command in ("pdftoppm", "pdftocairo"):
+        try:
+            poppler[command] = "{}.{}".format(*_get_poppler_version(command))
+        except OSError:
+            poppler[command] = None
+
+    try:
+        from importlib.metadata import version
+
+        pdf2image_version = version("pdf2image")
+    except Exception:
+        pdf2image_version = None
+
+    return {
+        "hostname": platform.node(),
+        "system": platform.system(),
+        "release": platform.release(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "pdf2image": pdf2image_version,
+        "poppler": poppler,
+    }
+
+
+def save(path: str, results: List[Dict]):
+    """Write results and the current fingerprint to `path`"""
+    with open(path, "w") as f:
+        json.dump(
+            {
+                "version": FORMAT_VERSION,
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "fingerprint": fingerprint(),
+                "results": [r for r in results if "skipped" not in r],
+            },
+            f,
+            indent=2,
+            sort_keys=True,
+        )
+
+
+def load(path: str) -> Dict:
+    with open(path) as f:
+        baseline = json.load(f)
+    if baseline.get("version") != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a version {FORMAT_VERSION} baseline")
+    return baseline
+
+
+def welch_ttest(a: List[float], b: List[float]) -> float:
+    """Two-sided p-value of Welch's t-test for the means of a and b"""
+    if len(a) < 2 or len(b) < 2:
+        return 1.0
+    va, vb = statistics.variance(a) / len(a), statistics.variance(b) / len(b)
+    if va + vb == 0:
+        return 0.0 if statistics.mean(a) != statistics.mean(b) else 1.0
+    t = (statistics.mean(a) - statistics.mean(b)) / math.sqrt(va + vb)
+    df = (va + vb) ** 2 / (va**2 / (len(a) - 1) + vb**2 / (len(b) - 1))
+    return _betainc(df / 2, 0.5, df / (df + t * t))
+
+
+def _betainc(a: float, b: float, x: float) -> float:
+    """Regularized incomplete beta function I_x(a, b), by continued fraction"""
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    if x > (a + 1) / (a + b + 2):
+        return 1.0 - _betainc(b, a, 1 - x)
+    front = (
+        math.exp(
+            math.lgamma(a + b)
+            - math.lgamma(a)
+            - math.lgamma(b)
+            + a * math.log(x)
+            + b * math.log(1 - x)
+        )
+        / a
+    )
+    # Lentz's algorithm
+    tiny = 1e-300
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    result = d
+    for m in range(1, 300):
+        for numerator in (
+            m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+            -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1)),
+        ):
+            d = 1.0 + numerator * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            result *= c * d
+        if abs(c * d - 1.0) < 1e-12:
+            break
+    return front * result
+
+
+def compare(
+    base: Dict,
+    current: Dict,
+    threshold: float = 0.05,
+    alpha: float = 0.05,
+    memory_threshold: float = 0.10,
+) -> List[Dict]:
+    """Compare every case present in both baselines
+
+    A case regresses when its mean time grows by more than `threshold` (relative)
+    and Welch's t-test rejects equal means at `alpha`, or when its peak memory grows
+    by more than `memory_threshold`.
+
+    :return: One row per case with the time ratio, p-value and a status among
+        "regression", "improvement" and "unchanged"
+    :rtype: List[Dict]
+    """
+    base_results = {r["id"]: r for r in base["results"]}
+    rows = []
+    for result in current["results"]:
+        previous = base_results.get(result["id"])
+        if previous is None:
+            continue
+        ratio = result["mean"] / previous["mean"]
+        p_value = welch_ttest(previous["samples"], result["samples"])
+        significant = p_value < alpha
+        status = "unchanged"
+        if significant and ratio > 1 + threshold:
+            status = "regression"
+        elif significant and ratio < 1 - threshold:
+            status = "improvement"
+
+        memory_ratio = None
+        if result.get("memory") and previous.get("memory"):
+            memory_ratio = max(
+                result["memory"]["peak_rss"] / previous["memory"]["peak_rss"],
+                result["memory"]["peak_children_rss"]
+                / max(previous["memory"]["peak_children_rss"], 1),
+            )
+            if memory_ratio > 1 + memory_threshold:
+                status = "regression"
+
+        rows.append(
+            {
+                "id": result["id"],
+                "base_mean": previous["mean"],
+                "mean": result["mean"],
+                "ratio": ratio,
+                "p_value": p_value,
+                "memory_ratio": memory_ratio,
+                "status": status,
+            }
+        )
+    return rows
+
+
+def fingerprint_differences(base: Dict, current: Dict) -> List[str]:
+    """Fingerprint fields that differ between two baselines"""
+    a, b = base["fingerprint"], current["fingerprint"]
+    return [key for key in sorted(set(a) | set(b)) if a.get(key) != b.get(key)]
+
+
+def print_comparison(rows: List[Dict], out=sys.stdout):
+    for row in rows:
+        memory = (
+            f" mem x{row['memory_ratio']:.2f}"
+            if row["memory_ratio"] is not None
+            else ""
+        )
+        out.write(
+            f"{row['id']:<60} {row['base_mean'] * 1000:10.3f} ms -> "
+            f"{row['mean'] * 1000:10.3f} ms x{row['ratio']:.3f} "
+            f"(p={row['p_value']:.3f}){memory} {row['status']}\n"
+        )
@@ -0,0 +1,153 @@
+"""
+    End-to-end benchmarks of convert_from_path and convert_from_bytes on tests/*.pdf
+"""
+
+import os
+import shutil
+import tempfile
+
+from pdf2image import convert_encoded, convert_from_bytes, convert_from_path
+
+from .corpus import generate_preset
+from .harness import SkipBenchmark, benchmark
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(__file__)), "tests")
+
+_CORPUS_FOLDER = None
+
+
+def fixture(name: str) -> str:
+    return os.path.join(FIXTURES, name)
+
+
+def _require_poppler(**kwargs):
+    if shutil.which("pdftoppm") is None:
+        raise SkipBenchmark("Poppler is not installed")
+
+
+def corpus_document(preset: str) -> str:
+    """Path to a synthetic document, generated once per run"""
+    global _CORPUS_FOLDER
+    if _CORPUS_FOLDER is None:
+        _CORPUS_FOLDER = tempfile.mkdtemp(prefix="pdf2image-corpus-")
+    path = os.path.join(_CORPUS_FOLDER, f"{preset}.pdf")
+    if not os.path.exists(path):
+        generate_preset(preset, _CORPUS_FOLDER)
+    return path
+
+
+def _corpus_setup(preset: str, **kwargs) -> str:
+    _require_poppler()
+    return corpus_document(preset)
+
+
+def _read_fixture(pdf: str, **kwargs) -> bytes:
+    _require_poppler()
+    with open(fixture(pdf), "rb") as f:
+        return f.read()
+
+
+@benchmark(
+    params={"pdf": ["test.pdf", "test_14.pdf", "test_241.pdf"]},
+    setup=_require_poppler,
+)
+def convert_page_count(pdf: str):
+    convert_from_path(fixture(pdf), dpi=100)
+
+
+@benchmark(params={"dpi": [72, 150, 300]}, setup=_require_poppler)
+def convert_dpi(dpi: int):
+    convert_from_path(fixture("test_14.pdf"), dpi=dpi)
+
+
+@benchmark(
+    params={"fmt": ["ppm", "jpeg", "png", "tiff"], "use_pdftocairo": [False, True]},
+    setup=_require_poppler,
+)
+def convert_fmt(fmt: str, use_pdftocairo: bool):
+    convert_from_path(
+        fixture("test_14.pdf"), dpi=100, fmt=fmt, use_pdftocairo=use_pdftocairo
+    )
+
+
+@benchmark(params={"fmt": ["ppm", "pgm", "pbm"]}, setup=_require_poppler)
+def convert_bilevel(fmt: str):
+    convert_from_path(
+        fixture("test_14.pdf"),
+        dpi=300,
+        fmt="ppm" if fmt == "pgm" else fmt,
+        grayscale=fmt == "pgm",
+    )
+
+
+@benchmark(
+    params={"quality": ["draft", "normal", "high"], "use_pdftocairo": [False, True]},
+    setup=_require_poppler,
+)
+def convert_quality(quality: str, use_pdftocairo: bool):
+    convert_from_path(
+        fixture("test_14.pdf"),
+        dpi=150,
+        quality=quality,
+        use_pdftocairo=use_pdftocairo,
+    )
+
+
+@benchmark(params={"thread_count": [1, 2, 4, 8]}, setup=_require_poppler)
+def convert_thread_count(thread_count: int):
+    convert_from_path(fixture("test_241.pdf"), dpi=72, thread_count=thread_count)
+
+
+@benchmark(params={"pdf": ["test.pdf", "test_14.pdf"]}, setup=_read_fixture)
+def convert_bytes(pdf: str, state: bytes):
+    convert_from_bytes(state, dpi=100)
+
+
+@benchmark(
+    params={
+        "preset": ["text", "vector", "images", "scanned", "receipts", "mixed"],
+        "thread_count": [1, 4],
+    },
+    setup=_corpus_setup,
+)
+def convert_corpus(preset: str, thread_count: int, state: str):
+    convert_from_path(state, dpi=150, thread_count=thread_count)
+
+
+@benchmark(
+    params={"preset": ["scanned", "mixed"], "extract_images": [False, True]},
+    setup=_corpus_setup,
+)
+def convert_extract_images(preset: str, extract_images: bool, state: str):
+    convert_from_path(state, dpi=300, extract_images=extract_images)
+
+
+@benchmark(
+    params={"preset": ["text", "mixed"], "skip_blank": [False, True]},
+    setup=_corpus_setup,
+)
+def convert_skip_blank(preset: str, skip_blank: bool, state: str):
+    convert_from_path(state, dpi=300, skip_blank=skip_blank)
+
+
+@benchmark(
+    params={"codec": ["cairo-png", "png", "webp"], "encode_thread_count": [1, 4]},
+    setup=_require_poppler,
+)
+def convert_encode_codec(codec: str, encode_thread_count: int):
+    if codec == "cairo-png":
+        convert_from_path(
+            fixture("test_14.pdf"),
+            dpi=100,
+            fmt="png",
+            use_pdftocairo=True,
+            encoded=True,
+        )
+    else:
+        convert_encoded(
+            fixture("test_14.pdf"),
+            codec=codec,
+            dpi=100,
+            thread_count=2,
+            encode_thread_count=encode_thread_count,
+        )
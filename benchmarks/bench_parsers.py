@@ -0,0 +1,60 @@
+"""
+    Benchmarks of the stdout parsers on synthetic multi-page streams
+"""
+
+from io import BytesIO
+
+from PIL import Image
+
+from pdf2image.parsers import (
+    parse_buffer_to_jpeg,
+    parse_buffer_to_pgm,
+    parse_buffer_to_png,
+    parse_buffer_to_ppm,
+)
+
+from .harness import benchmark
+
+PAGE_SIZE = (850, 1100)  # A letter page at 100 dpi
+
+PARSERS = {
+    "ppm": (parse_buffer_to_ppm, "RGB", "PPM"),
+    "pgm": (parse_buffer_to_pgm, "L", "PPM"),
+    "png": (parse_buffer_to_png, "RGB", "PNG"),
+    "jpeg": (parse_buffer_to_jpeg, "RGB", "JPEG"),
+}
+
+
+def synthetic_stream(fmt: str, pages: int, size=PAGE_SIZE) -> bytes:
+    """Returns `pages` concatenated encoded frames, like pdftoppm writes them to stdout"""
+    _, mode, pil_format = PARSERS[fmt]
+    frames = []
+    for i in range(pages):
+        # A gradient so that PNG/JPEG do not compress to nothing
+        im = Image.linear_gradient("L").resize(size).rotate(i * 7)
+        buf = BytesIO()
+        im.convert(mode).save(buf, pil_format)
+        frames.append(buf.getvalue())
+    return b"".join(frames)
+
+
+def _setup(fmt: str, pages: int):
+    return synthetic_stream(fmt, pages)
+
+
+@benchmark(
+    params={"fmt": list(PARSERS), "pages": [1, 10, 50]},
+    setup=_setup,
+)
+def parse_buffer(fmt: str, pages: int, state: bytes):
+    images = PARSERS[fmt][0](state)
+    assert len(images) == pages
+
+
+@benchmark(
+    params={"fmt": list(PARSERS), "pages": [10]},
+    setup=_setup,
+)
+def parse_buffer_and_load(fmt: str, pages: int, state: bytes):
+    for im in PARSERS[fmt][0](state):
+        im.load()
@@ -0,0 +1,401 @@
+"""
+    Deterministic synthetic PDF corpus for load testing
+
+    Documents are written by hand (no PDF library, no network), raster content is
+    drawn with Pillow, which pdf2image already depends on. The same seed always
+    produces byte-identical files.
+
+    Run `python -m benchmarks.corpus OUTPUT_FOLDER` to write every preset.
+"""
+
+import argparse
+import os
+import random
+import sys
+import zlib
+from io import BytesIO
+from typing import Dict, List, Tuple, Union
+
+from PIL import Image, ImageDraw
+
+PAGE_SIZES = {
+    "receipt": (226.77, 566.93),
+    "letter": (612.0, 792.0),
+    "legal": (612.0, 1008.0),
+    "a4": (595.28, 841.89),
+    "a3": (841.89, 1190.55),
+    "a0": (2383.94, 3370.39),
+}
+
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+    "incididunt ut labore et dolore magna aliqua invoice total amount due page "
+    "drawing scale section detail revision approved"
+).split()
+
+
+def page_spec(
+    page_size: Union[str, Tuple[float, float]] = "letter",
+    vector_density: int = 0,
+    text_lines: int = 0,
+    font: str = "Helvetica",
+    images: int = 0,
+    image_size: Tuple[int, int] = (256, 256),
+    image_encoding: str = "flate",
+    scanned: bool = False,
+    scan_dpi: int = 300,
+    color: bool = True,
+    blank: bool = False,
+) -> Dict:
+    """Describe one page of a synthetic document
+
+    :param page_size: Name from PAGE_SIZES or (width, height) in points, defaults to "letter"
+    :type page_size: Union[str, Tuple[float, float]], optional
+    :param vector_density: Number of filled rectangles, strokes and curves drawn on the page, defaults to 0
+    :type vector_density: int, optional
+    :param text_lines: Number of lines of text, defaults to 0
+    :type text_lines: int, optional
+    :param font: Standard 14 font used for the text (Helvetica, Times-Roman, Courier...), defaults to "Helvetica"
+    :type font: str, optional
+    :param images: Number of raster images placed on the page, defaults to 0
+    :type images: int, optional
+    :param image_size: Pixel size of each raster image, defaults to (256, 256)
+    :type image_size: Tuple[int, int], optional
+    :param image_encoding: "flate" or "jpeg", defaults to "flate"
+    :type image_encoding: str, optional
+    :param scanned: The page is a single full-page JPEG, like scanner output, defaults to False
+    :type scanned: bool, optional
+    :param scan_dpi: Resolution of the full-page image when scanned is True, defaults to 300
+    :type scan_dpi: int, optional
+    :param color: Use colors, otherwise every element is gray, defaults to True
+    :type color: bool, optional
+    :param blank: Leave the page empty (scanned pages get a blank scan), defaults to False
+    :type blank: bool, optional
+    :return: Page description accepted by write_pdf
+    :rtype: Dict
+    """
+    if isinstance(page_size, str):
+        page_size = PAGE_SIZES[page_size]
+    if image_encoding not in ("flate", "jpeg"):
+        raise ValueError(f"Unknown image encoding {image_encoding}")
+    return {
+        "size": tuple(float(v) for v in page_size),
+        "vector_density": vector_density,
+        "text_lines": text_lines,
+        "font": font,
+        "images": images,
+        "image_size": tuple(image_size),
+        "image_encoding": image_encoding,
+        "scanned": scanned,
+        "scan_dpi": scan_dpi,
+        "color": color,
+        "blank": blank,
+    }
+
+
+def write_pdf(path: str, pages: List[Dict], seed: int = 0) -> str:
+    """Write a PDF made of the given page specs
+
+    :param path: Output path
+    :type path: str
+    :param pages: Page descriptions from page_spec
+    :type pages: List[Dict]
+    :param seed: Random seed, defaults to 0
+    :type seed: int, optional
+    :return: The output path
+    :rtype: str
+    """
+    rng = random.Random(seed)
+    writer = _PDFWriter()
+    catalog = writer.reserve()
+    pages_root = writer.reserve()
+
+    fonts = {}
+    kids = []
+    for spec in pages:
+        resources_fonts = {}
+        resources_images = {}
+        content = []
+        w, h = spec["size"]
+
+        if spec["scanned"]:
+            px = (int(w * spec["scan_dpi"] / 72), int(h * spec["scan_dpi"] / 72))
+            im = _scanned_image(rng, px, spec["color"], spec["blank"])
+            resources_images["Im0"] = writer.image(im, "jpeg")
+            content.append(f"q {w:.2f} 0 0 {h:.2f} 0 0 cm /Im0 Do Q")
+        elif not spec["blank"]:
+            content.extend(
+                _vector_ops(rng, w, h, spec["vector_density"], spec["color"])
+            )
+            for i in range(spec["images"]):
+                im = _raster_image(rng, spec["image_size"], spec["color"])
+                name = f"Im{i}"
+                resources_images[name] = writer.image(im, spec["image_encoding"])
+                iw, ih = rng.uniform(0.1, 0.4) * w, rng.uniform(0.1, 0.4) * h
+                ix, iy = rng.uniform(0, w - iw), rng.uniform(0, h - ih)
+                content.append(
+                    f"q {iw:.2f} 0 0 {ih:.2f} {ix:.2f} {iy:.2f} cm /{name} Do Q"
+                )
+            if spec["text_lines"]:
+                if spec["font"] not in fonts:
+                    fonts[spec["font"]] = writer.add(
+                        f"<< /Type /Font /Subtype /Type1 /BaseFont /{spec['font']} "
+                        "/Encoding /WinAnsiEncoding >>".encode()
+                    )
+                resources_fonts["F1"] = fonts[spec["font"]]
+                content.extend(_text_ops(rng, w, h, spec["text_lines"]))
+
+        stream = writer.stream("\n".join(content).encode(), compress=True)
+        resources = ""
+        if resources_fonts:
+            resources += "/Font << {} >> ".format(
+                " ".join(f"/{k} {v} 0 R" for k, v in resources_fonts.items())
+            )
+        if resources_images:
+            resources += "/XObject << {} >>".format(
+                " ".join(f"/{k} {v} 0 R" for k, v in resources_images.items())
+            )
+        kids.append(
+            writer.add(
+                (
+                    f"<< /Type /Page /Parent {pages_root} 0 R "
+                    f"/MediaBox [0 0 {w:.2f} {h:.2f}] "
+                    f"/Resources << {resources} >> /Contents {stream} 0 R >>"
+                ).encode()
+            )
+        )
+
+    writer.set(
+        pages_root,
+        "<< /Type /Pages /Kids [{}] /Count {} >>".format(
+            " ".join(f"{k} 0 R" for k in kids), len(kids)
+        ).encode(),
+    )
+    writer.set(catalog, f"<< /Type /Catalog /Pages {pages_root} 0 R >>".encode())
+    writer.save(path, catalog)
+    return path
+
+
+def generate_pdf(path: str, pages: int = 1, seed: int = 0, **kwargs) -> str:
+    """Write a PDF of `pages` identical page specs, kwargs are passed to page_spec
+
+    `page_size` may also be a list of sizes, cycled over the pages.
+    """
+    sizes = kwargs.pop("page_size", "letter")
+    if not isinstance(sizes, list):
+        sizes = [sizes]
+    specs = [page_spec(page_size=sizes[i % len(sizes)], **kwargs) for i in range(pages)]
+    return write_pdf(path, specs, seed=seed)
+
+
+def _mixed(rng: random.Random, pages: int) -> List[Dict]:
+    specs = []
+    for _ in range(pages):
+        kind = rng.random()
+        if kind < 0.4:
+            specs.append(page_spec("letter", text_lines=45, vector_density=10))
+        elif kind < 0.6:
+            specs.append(page_spec("letter", scanned=True, scan_dpi=200, color=False))
+        elif kind < 0.7:
+            specs.append(page_spec("letter", blank=True))
+        elif kind < 0.85:
+            specs.append(page_spec("a4", text_lines=20, images=2))
+        else:
+            specs.append(page_spec("a3", vector_density=1500, color=rng.random() < 0.5))
+    return specs
+
+
+PRESETS = {
+    "text": lambda rng: [page_spec("letter", text_lines=50) for _ in range(20)],
+    "vector": lambda rng: [page_spec("a3", vector_density=2000) for _ in range(10)],
+    "images": lambda rng: [
+        page_spec("letter", text_lines=10, images=4) for _ in range(10)
+    ],
+    "scanned": lambda rng: [page_spec("letter", scanned=True) for _ in range(10)],
+    "drawing": lambda rng: [page_spec("a0", vector_density=20000, color=False)],
+    "receipts": lambda rng: [page_spec("receipt", text_lines=30) for _ in range(20)],
+    "mixed": lambda rng: _mixed(rng, 50),
+}
+
+
+def generate_preset(name: str, output_folder: str, seed: int = 0) -> str:
+    """Write the named preset to `output_folder`/`name`.pdf and return its path"""
+    return write_pdf(
+        os.path.join(output_folder, f"{name}.pdf"),
+        PRESETS[name](random.Random(seed)),
+        seed=seed,
+    )
+
+
+def generate_corpus(
+    output_folder: str, presets: List[str] = None, seed: int = 0
+) -> List[str]:
+    """Write every (or the given) preset to `output_folder` and return the paths"""
+    os.makedirs(output_folder, exist_ok=True)
+    return [
+        generate_preset(name, output_folder, seed=seed) for name in (presets or PRESETS)
+    ]
+
+
+class _PDFWriter(object):
+    def __init__(self):
+        self.objects = []
+
+    def reserve(self) -> int:
+        self.objects.append(None)
+        return len(self.objects)
+
+    def set(self, num: int, body: bytes):
+        self.objects[num - 1] = body
+
+    def add(self, body: bytes) -> int:
+        num = self.reserve()
+        self.set(num, body)
+        return num
+
+    def stream(self, data: bytes, compress: bool = False, extra: str = "") -> int:
+        if compress:
+            data = zlib.compress(data)
+            extra = "/Filter /FlateDecode " + extra
+        return self.add(
+            f"<< {extra}/Length {len(data)} >>\nstream\n".encode()
+            + data
+            + b"\nendstream"
+        )
+
+    def image(self, im: Image.Image, encoding: str) -> int:
+        colorspace = "/DeviceRGB" if im.mode == "RGB" else "/DeviceGray"
+        header = (
+            f"/Type /XObject /Subtype /Image /Width {im.width} /Height {im.height} "
+            f"/ColorSpace {colorspace} /BitsPerComponent 8 "
+        )
+        if encoding == "jpeg":
+            buf = BytesIO()
+            im.save(buf, "JPEG", quality=75)
+            return self.stream(buf.getvalue(), extra=header + "/Filter /DCTDecode ")
+        return self.stream(im.tobytes(), compress=True, extra=header)
+
+    def save(self, path: str, root: int):
+        out = BytesIO()
+        out.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for num, body in enumerate(self.objects, start=1):
+            offsets.append(out.tell())
+            out.write(f"{num} 0 obj\n".encode() + body + b"\nendobj\n")
+        xref = out.tell()
+        out.write(f"xref\n0 {len(self.objects) + 1}\n0000000000 65535 f \n".encode())
+        for offset in offsets:
+            out.write(f"{offset:010d} 00000 n \n".encode())
+        out.write(
+            f"trailer\n<< /Size {len(self.objects) + 1} /Root {root} 0 R >>\n"
+            f"startxref\n{xref}\n%%EOF\n".encode()
+        )
+        with open(path, "wb") as f:
+            f.write(out.getvalue())
+
+
+def _color(rng: random.Random, color: bool) -> str:
+    if color:
+        return "{:.3f} {:.3f} {:.3f}".format(rng.random(), rng.random(), rng.random())
+    return "{0:.3f} {0:.3f} {0:.3f}".format(rng.random())
+
+
+def _vector_ops(rng: random.Random, w: float, h: float, count: int, color: bool):
+    ops = []
+    for _ in range(count):
+        kind = rng.random()
+        x1, y1 = rng.uniform(0, w), rng.uniform(0, h)
+        x2, y2 = rng.uniform(0, w), rng.uniform(0, h)
+        if kind < 0.4:
+            ops.append(
+                f"{_color(rng, color)} rg {x1:.2f} {y1:.2f} "
+                f"{rng.uniform(1, w / 8):.2f} {rng.uniform(1, h / 8):.2f} re f"
+            )
+        elif kind < 0.8:
+            ops.append(
+                f"{_color(rng, color)} RG {rng.uniform(0.1, 3):.2f} w "
+                f"{x1:.2f} {y1:.2f} m {x2:.2f} {y2:.2f} l S"
+            )
+        else:
+            cx1, cy1 = rng.uniform(0, w), rng.uniform(0, h)
+            ops.append(
+                f"{_color(rng, color)} RG {x1:.2f} {y1:.2f} m "
+                f"{cx1:.2f} {cy1:.2f} {x2:.2f} {y1:.2f} {x2:.2f} {y2:.2f} c S"
+            )
+    return ops
+
+
+def _text_ops(rng: random.Random, w: float, h: float, lines: int):
+    size = max(4.0, min(12.0, (h - 72) / max(lines, 1) / 1.3))
+    ops = [f"BT /F1 {size:.1f} Tf {size * 1.3:.2f} TL 36 {h - 36 - size:.2f} Td"]
+    chars_per_line = int((w - 72) / (size * 0.5))
+    for _ in range(lines):
+        line = ""
+        while len(line) < chars_per_line - 12:
+            line += rng.choice(WORDS) + " "
+        ops.append(f"({line.strip()}) Tj T*")
+    ops.append("ET")
+    return ops
+
+
+def _raster_image(
+    rng: random.Random, size: Tuple[int, int], color: bool
+) -> Image.Image:
+    im = Image.linear_gradient("L").rotate(rng.uniform(0, 360)).resize(size)
+    if color:
+        im = Image.merge(
+            "RGB",
+            [
+                im,
+                Image.radial_gradient("L").resize(size),
+                im.rotate(rng.uniform(0, 360)),
+            ],
+        )
+    draw = ImageDraw.Draw(im)
+    for _ in range(20):
+        x, y = rng.randrange(size[0]), rng.randrange(size[1])
+        if color:
+            fill = tuple(rng.randrange(256) for _ in range(3))
+        else:
+            fill = rng.randrange(256)
+        draw.ellipse([x, y, x + size[0] // 8, y + size[1] // 8], fill=fill)
+    return im
+
+
+def _scanned_image(
+    rng: random.Random, size: Tuple[int, int], color: bool, blank: bool
+) -> Image.Image:
+    paper = (248, 246, 240) if color else 247
+    im = Image.new("RGB" if color else "L", size, paper)
+    if blank:
+        return im
+    draw = ImageDraw.Draw(im)
+    ink = (30, 30, 40) if color else 35
+    margin = size[0] // 10
+    line_height = max(4, size[1] // 60)
+    y = margin
+    while y < size[1] - margin:
+        x = margin
+        while x < size[0] - margin:
+            word = rng.randint(line_height, line_height * 5)
+            draw.rectangle(
+                [x, y, min(x + word, size[0] - margin), y + line_height // 3], fill=ink
+            )
+            x += word + line_height
+        y += line_height
+    return im
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.corpus")
+    parser.add_argument("output_folder")
+    parser.add_argument("--preset", action="append", choices=sorted(PRESETS))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    for path in generate_corpus(args.output_folder, args.preset, seed=args.seed):
+        print(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
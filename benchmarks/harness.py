@@ -0,0 +1,202 @@
+"""
+    Minimal benchmark harness, every benchmark is a function taking keyword parameters
+"""
+
+import gc
+import importlib
+import itertools
+import multiprocessing
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BENCHMARKS = []
+
+SUITES = ["bench_parsers", "bench_convert"]
+
+
+def load_benchmarks():
+    """Import every suite module so that their benchmarks get registered"""
+    for suite in SUITES:
+        importlib.import_module(f"{__package__}.{suite}")
+
+
+def find_benchmark(name: str) -> "Benchmark":
+    for bench in BENCHMARKS:
+        if bench.name == name:
+            return bench
+    raise KeyError(name)
+
+
+class Benchmark(object):
+    """A registered benchmark function and the parameter grid it runs over"""
+
+    def __init__(self, func: Callable, name: str, params: Dict, setup: Callable):
+        self.func = func
+        self.name = name
+        self.params = params
+        self.setup = setup
+
+    def cases(self) -> List[Dict]:
+        keys = list(self.params)
+        return [
+            dict(zip(keys, values))
+            for values in itertools.product(*(self.params[k] for k in keys))
+        ]
+
+
+def benchmark(name: str = None, params: Dict = None, setup: Callable = None):
+    """Decorator registering a benchmark
+
+    :param name: Name of the benchmark, defaults to the function name
+    :type name: str, optional
+    :param params: Mapping of parameter name to the list of values to run, defaults to None
+    :type params: Dict, optional
+    :param setup: Called with the case parameters, its return value is passed to the benchmark as `state`, defaults to None
+    :type setup: Callable, optional
+    """
+
+    def decorator(func):
+        BENCHMARKS.append(Benchmark(func, name or func.__name__, params or {}, setup))
+        return func
+
+    return decorator
+
+
+class SkipBenchmark(Exception):
+    """Raised by a benchmark or its setup when it cannot run in this environment"""
+
+    pass
+
+
+def case_id(name: str, case: Dict) -> str:
+    if not case:
+        return name
+    return "{}[{}]".format(name, ",".join(f"{k}={v}" for k, v in case.items()))
+
+
+def _memory_worker(name: str, case: Dict, queue):
+    try:
+        load_benchmarks()
+        bench = find_benchmark(name)
+        state = bench.setup(**case) if bench.setup is not None else None
+        before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        kwargs = dict(case)
+        if state is not None:
+            kwargs["state"] = state
+        bench.func(**kwargs)
+        self_usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        children_usage = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        queue.put((before, self_usage, children_usage))
+    except Exception:
+        queue.put(None)
+        raise
+
+
+def measure_memory(bench: Benchmark, case: Dict) -> Dict:
+    """Peak resident memory of one call, measured in a fresh interpreter
+
+    `peak_rss` is the high-water mark of the Python process, `peak_children_rss`
+    the largest poppler process it spawned, both in bytes. Returns None where the
+    resource module is not available.
+    """
+    if resource is None:
+        return None
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_memory_worker, args=(bench.name, case, queue))
+    proc.start()
+    usage = queue.get()
+    proc.join()
+    if usage is None:
+        return None
+    before, self_usage, children_usage = usage
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    unit = 1 if sys.platform == "darwin" else 1024
+    return {
+        "baseline_rss": before * unit,
+        "peak_rss": self_usage * unit,
+        "peak_children_rss": children_usage * unit,
+    }
+
+
+def run_case(
+    bench: Benchmark,
+    case: Dict,
+    repeat: int = 5,
+    min_time: float = 0.2,
+    memory: bool = False,
+) -> Dict:
+    """Time one case of a benchmark
+
+    Each sample runs the function enough times to last at least `min_time` seconds,
+    the reported values are per call.
+    """
+    state = bench.setup(**case) if bench.setup is not None else None
+    kwargs = dict(case)
+    if state is not None:
+        kwargs["state"] = state
+
+    # Warm up and calibrate the number of calls per sample
+    start = time.perf_counter()
+    bench.func(**kwargs)
+    elapsed = time.perf_counter() - start
+    number = max(1, int(min_time / elapsed)) if elapsed > 0 else 1000
+
+    samples = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                bench.func(**kwargs)
+            samples.append((time.perf_counter() - start) / number)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    return {
+        "name": bench.name,
+        "params": case,
+        "number": number,
+        "samples": samples,
+        "mean": statistics.mean(samples),
+        "median": statistics.median(samples),
+        "min": min(samples),
+        "stddev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "memory": measure_memory(bench, case) if memory else None,
+    }
+
+
+def run(
+    pattern: str = None,
+    repeat: int = 5,
+    min_time: float = 0.2,
+    memory: bool = False,
+    report: Callable = None,
+) -> List[Dict]:
+    """Run every registered benchmark whose case id contains `pattern`"""
+    results = []
+    for bench in BENCHMARKS:
+        for case in bench.cases():
+            cid = case_id(bench.name, case)
+            if pattern and pattern not in cid:
+                continue
+            try:
+                result = run_case(
+                    bench, case, repeat=repeat, min_time=min_time, memory=memory
+                )
+            except SkipBenchmark as e:
+                result = {"name": bench.name, "params": case, "skipped": str(e)}
+            result["id"] = cid
+            results.append(result)
+            if report is not None:
+                report(result)
+    return results
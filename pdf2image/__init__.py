@@ -6,3 +6,21 @@ from .pdf2image import convert_from_bytes as convert_from_bytes
 from .pdf2image import convert_from_path as convert_from_path
 from .pdf2image import pdfinfo_from_bytes as pdfinfo_from_bytes
 from .pdf2image import pdfinfo_from_path as pdfinfo_from_path
+from .pdf2image import page_geometry_from_bytes as page_geometry_from_bytes
+from .pdf2image import page_geometry_from_path as page_geometry_from_path
+from .pdf2image import render_region as render_region
+from .cache import PageCache as PageCache
+from .geometry import PageGeometry as PageGeometry
+from .cache import RenderCache as RenderCache
+from .lazy import LazyPage as LazyPage
+from .lazy import LazyPages as LazyPages
+from .session import DocumentSession as DocumentSession
+from .tiles import iter_tiles as iter_tiles
+from .tiles import render_tiled as render_tiled
+from .pyramid import render_pyramid as render_pyramid
+from .progressive import iter_progressive as iter_progressive
+from .parsers import EncodedPage as EncodedPage
+from .store import CompressedPages as CompressedPages
+from .encode import convert_encoded as convert_encoded
+from .encode import iter_encoded as iter_encoded
+from .store import PageList as PageList
@@ -0,0 +1,65 @@
+"""
+    pdf2image page analysis, vectorized with Pillow
+"""
+
+from PIL import Image, ImageChops, ImageStat
+
+# Largest difference between the channels of a pixel that still counts as gray,
+# rendered gray is exact but JPEG chroma subsampling adds a little noise
+GRAYSCALE_TOLERANCE = 4
+# A pixel is ink when it is this much darker than the paper, the most common brightness
+BLANK_INK_THRESHOLD = 64
+# Largest fraction of ink pixels and standard deviation of the brightness of a blank page,
+# a line of text at 36 dpi covers about 0.1% of a letter page
+BLANK_MAX_COVERAGE = 0.0005
+BLANK_MAX_STDDEV = 8.0
+
+
+def is_grayscale(image: Image.Image, tolerance: int = GRAYSCALE_TOLERANCE) -> bool:
+    """Whether every pixel of an RGB image has R, G and B within tolerance of each other
+
+    :param image: Page to check, images in other modes than RGB are not grayscale
+    :type image: Image.Image
+    :param tolerance: Largest difference between two channels of a pixel, defaults to 4
+    :type tolerance: int, optional
+    :rtype: bool
+    """
+    if image.mode != "RGB":
+        return False
+    red, green, blue = image.split()
+    # Both differences are computed over whole bands in C, without Python loops
+    for a, b in ((red, green), (green, blue)):
+        if ImageChops.difference(a, b).getextrema()[1] > tolerance:
+            return False
+    return True
+
+
+def is_blank(
+    image: Image.Image,
+    ink_threshold: int = BLANK_INK_THRESHOLD,
+    max_coverage: float = BLANK_MAX_COVERAGE,
+    max_stddev: float = BLANK_MAX_STDDEV,
+) -> bool:
+    """Whether a page has (almost) no ink and (almost) uniform brightness
+
+    Ink is measured relative to the paper, so tinted or scanned paper can be blank,
+    the brightness deviation catches faint content such as pencil or light scans.
+
+    :param image: Page to check, a low resolution grayscale render is enough
+    :type image: Image.Image
+    :param ink_threshold: How much darker than the paper a pixel must be to be ink, defaults to 64
+    :type ink_threshold: int, optional
+    :param max_coverage: Largest fraction of ink pixels, defaults to 0.0005
+    :type max_coverage: float, optional
+    :param max_stddev: Largest standard deviation of the brightness, defaults to 8.0
+    :type max_stddev: float, optional
+    :rtype: bool
+    """
+    if image.mode != "L":
+        image = image.convert("L")
+    histogram = image.histogram()
+    paper = max(range(256), key=histogram.__getitem__)
+    ink = sum(histogram[: max(paper - ink_threshold, 0)])
+    if ink > max_coverage * image.width * image.height:
+        return False
+    return ImageStat.Stat(image).stddev[0] <= max_stddev
@@ -0,0 +1,330 @@
+"""
+    pdf2image content-addressed render cache
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict
+
+from pdf2image import metrics
+
+CACHE_FORMAT_VERSION = 1
+
+# Hashes of the documents seen recently, keyed by path, size and modification time
+_DOCUMENT_HASHES = OrderedDict()
+_DOCUMENT_HASHES_LOCK = threading.Lock()
+_DOCUMENT_HASHES_MAX_SIZE = 1024
+
+
+def default_cache_dir() -> str:
+    """Returns $XDG_CACHE_HOME/pdf2image, or ~/.cache/pdf2image"""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "pdf2image")
+
+
+def document_hash(pdf_path: str) -> str:
+    """SHA-256 of the document content, memoized on its path, size and modification time
+
+    For a document held in memory, this is hashlib.sha256(pdf_bytes).hexdigest()
+    """
+    stat = os.stat(pdf_path)
+    memo_key = (os.path.realpath(pdf_path), stat.st_size, stat.st_mtime_ns)
+    with _DOCUMENT_HASHES_LOCK:
+        if memo_key in _DOCUMENT_HASHES:
+            _DOCUMENT_HASHES.move_to_end(memo_key)
+            return _DOCUMENT_HASHES[memo_key]
+    digest = hashlib.sha256()
+    with open(pdf_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    with _DOCUMENT_HASHES_LOCK:
+        _DOCUMENT_HASHES[memo_key] = digest.hexdigest()
+        if len(_DOCUMENT_HASHES) > _DOCUMENT_HASHES_MAX_SIZE:
+            _DOCUMENT_HASHES.popitem(last=False)
+    return digest.hexdigest()
+
+
+def page_key(document_hash: str, **params) -> str:
+    """Key of one rendered page, params must hold every option that changes the output"""
+    payload = json.dumps(
+        [CACHE_FORMAT_VERSION, document_hash, params], sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode("utf8")).hexdigest()
+
+
+class RenderCache(object):
+    """On-disk cache of rendered pages, shared by threads and processes
+
+    Entries are the encoded pages as produced by poppler, stored under a hash of the
+    document content and every parameter that changes the rendering. Writes are atomic
+    (temporary file then rename) and least recently used entries are deleted once the
+    cache grows past max_size.
+
+    :param cache_dir: Folder holding the entries, defaults to default_cache_dir()
+    :type cache_dir: str, optional
+    :param max_size: Maximum size of the cache in bytes, defaults to 1 GiB
+    :type max_size: int, optional
+    """
+
+    def __init__(self, cache_dir: str = None, max_size: int = 1024**3):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._size = None
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def key(self, document_hash: str, **params) -> str:
+        """Cache key of one page, see page_key"""
+        return page_key(document_hash, **params)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def get(self, key: str) -> bytes:
+        """Returns the cached page, or None"""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            # The modification time orders entries for eviction
+            os.utime(path)
+        except OSError:
+            # Missing, or evicted by another process while we were reading it
+            with self.lock:
+                self.misses += 1
+            metrics.CACHE_MISSES.inc(cache="render")
+            return None
+        with self.lock:
+            self.hits += 1
+        metrics.CACHE_HITS.inc(cache="render")
+        return data
+
+    def put(self, key: str, data: bytes):
+        """Store a page, evicting old entries if the cache becomes too large"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            # An entry we overwrite no longer counts towards the size
+            try:
+                replaced_size = os.stat(path).st_size
+            except OSError:
+                replaced_size = 0
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        with self.lock:
+            self.writes += 1
+            if self._size is not None:
+                self._size += len(data) - replaced_size
+            over_budget = self._size is None or self._size > self.max_size
+        if over_budget:
+            self.evict()
+
+    def evict(self, target_size: int = None):
+        """Delete least recently used entries until the cache fits in target_size
+
+        :param target_size: Size to reach, defaults to 90% of max_size
+        :type target_size: int, optional
+        """
+        trim = target_size is not None
+        if target_size is None:
+            target_size = self.max_size * 9 // 10
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.startswith(".tmp-"):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(root, name))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, os.path.join(root, name)))
+                total += stat.st_size
+
+        if trim or total > self.max_size:
+            entries.sort()
+            for _, entry_size, path in entries:
+                if total <= target_size:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= entry_size
+                with self.lock:
+                    self.evictions += 1
+
+        with self.lock:
+            self._size = total
+
+    def clear(self):
+        """Delete every entry"""
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                try:
+                    os.remove(os.path.join(root, name))
+                except OSError:
+                    pass
+        with self.lock:
+            self._size = 0
+
+    def stats(self) -> Dict:
+        """Returns hits, misses, writes, evictions, hit_rate and size in bytes"""
+        if self._size is None:
+            self.evict()
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": self._size,
+            }
+
+
+def _nbytes(value: Any) -> int:
+    """Memory used by a decoded page, either a NumPy array or a Pillow image"""
+    if hasattr(value, "nbytes"):
+        return value.nbytes
+    bytes_per_band = 4 if value.mode in ("I", "F") else 1
+    return value.width * value.height * len(value.getbands()) * bytes_per_band
+
+
+class PageCache(object):
+    """In-memory LRU cache of decoded pages, bounded by their size in bytes
+
+    Values are Pillow images or NumPy arrays. get returns a copy so that callers can
+    modify what they receive without altering the cache.
+
+    :param max_bytes: Maximum size of the decoded pages kept, defaults to 256 MiB
+    :type max_bytes: int, optional
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024**2):
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.documents = {}
+        self.paths = {}
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key: str) -> bool:
+        """Whether the page is cached, without counting a lookup"""
+        with self.lock:
+            return key in self.entries
+
+    def get(self, key: str) -> Any:
+        """Returns a copy of the cached page, or None"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self.entries.move_to_end(key)
+                self.hits += 1
+        if entry is None:
+            metrics.CACHE_MISSES.inc(cache="page")
+            return None
+        metrics.CACHE_HITS.inc(cache="page")
+        return entry[0].copy()
+
+    def put(self, key: str, value: Any, document_hash: str, pdf_path: str = None):
+        """Store a decoded page of the given document
+
+        :param key: Page key, see page_key
+        :type key: str
+        :param value: Decoded page, it must not be modified afterwards
+        :type value: Any
+        :param document_hash: Hash of the document the page belongs to
+        :type document_hash: str
+        :param pdf_path: Path of the document, allows invalidate(pdf_path=...), defaults to None
+        :type pdf_path: str, optional
+        """
+        nbytes = _nbytes(value)
+        if nbytes > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (value, nbytes, document_hash)
+            self.documents.setdefault(document_hash, set()).add(key)
+            if pdf_path is not None:
+                self.paths.setdefault(os.path.realpath(pdf_path), set()).add(
+                    document_hash
+                )
+            self.size += nbytes
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+                self.evictions += 1
+
+    def _remove(self, key: str):
+        _, nbytes, document_hash = self.entries.pop(key)
+        self.size -= nbytes
+        keys = self.documents[document_hash]
+        keys.discard(key)
+        if not keys:
+            del self.documents[document_hash]
+            for path, hashes in list(self.paths.items()):
+                hashes.discard(document_hash)
+                if not hashes:
+                    del self.paths[path]
+
+    def invalidate(self, pdf_path: str = None, document_hash: str = None) -> int:
+        """Drop every page of a document, given by path or by hash
+
+        Invalidating by path also drops pages of older versions of the file.
+
+        :return: Number of pages dropped
+        :rtype: int
+        """
+        with self.lock:
+            hashes = set()
+            if document_hash is not None:
+                hashes.add(document_hash)
+            if pdf_path is not None:
+                hashes |= self.paths.pop(os.path.realpath(pdf_path), set())
+            keys = [key for h in hashes for key in self.documents.get(h, ())]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self):
+        """Drop every page"""
+        with self.lock:
+            self.entries.clear()
+            self.documents.clear()
+            self.paths.clear()
+            self.size = 0
+
+    def stats(self) -> Dict:
+        """Returns hits, misses, evictions, hit_rate, entries and size in bytes"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self.entries),
+                "size": self.size,
+            }
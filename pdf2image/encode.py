@@ -0,0 +1,185 @@
+"""
+    pdf2image parallel encoding of rendered pages to PNG, WebP or AVIF
+"""
+
+import itertools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import PurePath
+from typing import Iterator, List, Union
+
+from PIL import Image
+
+from pdf2image.parsers import EncodedPage
+from pdf2image.pdf2image import _document_path, convert_from_path, pdfinfo_from_path
+
+CODECS = ("png", "webp", "avif")
+
+
+def _check_codec(codec: str):
+    if codec not in CODECS:
+        raise ValueError(f"Unknown codec {codec}, expected one of {CODECS}")
+    Image.init()
+    if codec.upper() not in Image.SAVE:
+        raise ValueError(f"This build of Pillow cannot encode {codec}")
+
+
+def encode_frame(
+    data: bytes,
+    codec: str = "png",
+    quality: int = 80,
+    lossless: bool = False,
+    compress_level: int = 1,
+    method: int = 0,
+) -> bytes:
+    """Encode a page written by poppler (usually PPM) with the given codec
+
+    :param data: Encoded page
+    :type data: bytes
+    :param codec: One of png, webp and avif, defaults to "png"
+    :type codec: str, optional
+    :param quality: Quality of lossy WebP and AVIF, from 0 to 100, defaults to 80
+    :type quality: int, optional
+    :param lossless: Lossless WebP, defaults to False
+    :type lossless: bool, optional
+    :param compress_level: zlib level of PNG, from 0 to 9, defaults to 1
+    :type compress_level: int, optional
+    :param method: WebP effort, from 0 (fastest) to 6, defaults to 0
+    :type method: int, optional
+    :raises ValueError: Raised when the codec is unknown or not supported by Pillow
+    :return: Encoded page
+    :rtype: bytes
+    """
+    _check_codec(codec)
+    image = Image.open(BytesIO(data))
+    if image.mode == "1" and codec != "png":
+        image = image.convert("L")
+    output = BytesIO()
+    if codec == "png":
+        image.save(output, "PNG", compress_level=compress_level)
+    elif codec == "webp":
+        image.save(output, "WEBP", quality=quality, lossless=lossless, method=method)
+    else:
+        image.save(output, "AVIF", quality=quality)
+    return output.getvalue()
+
+
+def iter_encoded(
+    pdf: Union[str, PurePath, bytes],
+    first_page: int = None,
+    last_page: int = None,
+    codec: str = "png",
+    quality: int = 80,
+    lossless: bool = False,
+    compress_level: int = 1,
+    method: int = 0,
+    thread_count: int = 1,
+    encode_thread_count: int = 2,
+    batch_size: int = 4,
+    **kwargs,
+) -> Iterator[EncodedPage]:
+    """Render pages to PPM with pdftoppm and encode them on a separate pool of threads
+
+    Pages are rendered in batches of batch_size, by up to thread_count poppler processes
+    at once. As soon as a batch is rendered its pages are encoded by encode_thread_count
+    threads while the next batches render. Pillow releases the GIL while encoding, so
+    both stages use separate cores. At most thread_count batches are held in memory.
+
+    :param pdf: Path to the PDF, or its bytes
+    :type pdf: Union[str, PurePath, bytes]
+    :param first_page: First page to process, defaults to None
+    :type first_page: int, optional
+    :param last_page: Last page to process before stopping, defaults to None
+    :type last_page: int, optional
+    :param codec: One of png, webp and avif (when Pillow supports it), defaults to "png"
+    :type codec: str, optional
+    :param quality: Quality of lossy WebP and AVIF, from 0 to 100, defaults to 80
+    :type quality: int, optional
+    :param lossless: Lossless WebP, defaults to False
+    :type lossless: bool, optional
+    :param compress_level: zlib level of PNG, from 0 to 9, defaults to 1
+    :type compress_level: int, optional
+    :param method: WebP effort, from 0 (fastest) to 6, defaults to 0
+    :type method: int, optional
+    :param thread_count: How many poppler processes render at the same time, defaults to 1
+    :type thread_count: int, optional
+    :param encode_thread_count: How many threads encode at the same time, defaults to 2
+    :type encode_thread_count: int, optional
+    :param batch_size: Number of pages rendered by each poppler process, defaults to 4
+    :type batch_size: int, optional
+    :param kwargs: Other parameters of convert_from_path (dpi, grayscale, userpw, ...), except fmt and output_folder
+    :raises ValueError: Raised when the codec is unknown or not supported by Pillow
+    :return: Iterator of EncodedPage, in page order
+    :rtype: Iterator[EncodedPage]
+    """
+    _check_codec(codec)
+    with _document_path(pdf) as pdf_path:
+        page_count = pdfinfo_from_path(
+            pdf_path,
+            kwargs.get("userpw"),
+            kwargs.get("ownerpw"),
+            poppler_path=kwargs.get("poppler_path"),
+        )["Pages"]
+        if first_page is None or first_page < 1:
+            first_page = 1
+        if last_page is None or last_page > page_count:
+            last_page = page_count
+        batch_size = max(batch_size, 1)
+        thread_count = max(thread_count, 1)
+        batches = (
+            (first, min(first + batch_size - 1, last_page))
+            for first in range(first_page, last_page + 1, batch_size)
+        )
+
+        def render(batch):
+            return convert_from_path(
+                pdf_path,
+                first_page=batch[0],
+                last_page=batch[1],
+                fmt="ppm",
+                encoded=True,
+                **kwargs,
+            )
+
+        def encode(page):
+            return EncodedPage(
+                page.page_number,
+                encode_frame(
+                    page.data, codec, quality, lossless, compress_level, method
+                ),
+            )
+
+        with ThreadPoolExecutor(thread_count) as render_pool, ThreadPoolExecutor(
+            max(encode_thread_count, 1)
+        ) as encode_pool:
+            pending = deque(
+                render_pool.submit(render, batch)
+                for batch in itertools.islice(batches, thread_count)
+            )
+            try:
+                while pending:
+                    pages = pending.popleft().result()
+                    for batch in itertools.islice(batches, 1):
+                        pending.append(render_pool.submit(render, batch))
+                    for future in [encode_pool.submit(encode, page) for page in pages]:
+                        yield future.result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+
+def convert_encoded(
+    pdf: Union[str, PurePath, bytes], codec: str = "png", **kwargs
+) -> List[EncodedPage]:
+    """Same as iter_encoded, but returns the list of pages
+
+    :param pdf: Path to the PDF, or its bytes
+    :type pdf: Union[str, PurePath, bytes]
+    :param codec: One of png, webp and avif (when Pillow supports it), defaults to "png"
+    :type codec: str, optional
+    :param kwargs: Other parameters of iter_encoded and convert_from_path
+    :return: List of EncodedPage, in page order
+    :rtype: List[EncodedPage]
+    """
+    return list(iter_encoded(pdf, codec=codec, **kwargs))
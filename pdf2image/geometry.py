@@ -0,0 +1,112 @@
+"""
+    pdf2image per-page geometry index built from pdfinfo
+"""
+
+from array import array
+from typing import Dict, List, Tuple
+
+BOXES = ("MediaBox", "CropBox", "BleedBox", "TrimBox", "ArtBox")
+
+
+class PageGeometry(object):
+    """Compact index of the page sizes, rotations and boxes of a range of pages
+
+    Values are stored in flat arrays, parsed once from the output of pdfinfo -f -l -box.
+    Sizes and boxes are in PDF points, boxes are (x0, y0, x1, y1) as in the document.
+
+    :param first_page: Number of the first indexed page
+    :type first_page: int
+    :param widths: Width of each page, as pdfinfo reports it (crop box, before rotation)
+    :type widths: array
+    :param heights: Height of each page, as pdfinfo reports it (crop box, before rotation)
+    :type heights: array
+    :param rotations: Rotation of each page in degrees
+    :type rotations: array
+    :param boxes: Flat (x0, y0, x1, y1) coordinates of each page, by box name
+    :type boxes: Dict[str, array]
+    """
+
+    def __init__(
+        self,
+        first_page: int,
+        widths: array,
+        heights: array,
+        rotations: array,
+        boxes: Dict[str, array] = None,
+    ):
+        self.first_page = first_page
+        self.widths = widths
+        self.heights = heights
+        self.rotations = rotations
+        self.boxes = boxes or {}
+
+    @classmethod
+    def from_pdfinfo(
+        cls, info: Dict, first_page: int, last_page: int
+    ) -> "PageGeometry":
+        """Build the index from the dictionary returned by pdfinfo_from_path"""
+        widths, heights, rotations = array("d"), array("d"), array("h")
+        boxes = {name: array("d") for name in BOXES}
+        for page in range(first_page, last_page + 1):
+            prefix = f"Page {page:4d}"
+            # e.g. "Page    1 size: 612 x 792 pts (letter)"
+            width, _, height = info[f"{prefix} size"].split()[:3]
+            widths.append(float(width))
+            heights.append(float(height))
+            rotations.append(int(info.get(f"{prefix} rot", "0")) % 360)
+            for name in BOXES:
+                # e.g. "Page    1 MediaBox:     0.00     0.00   612.00   792.00"
+                if f"{prefix} {name}" in info:
+                    boxes[name].extend(
+                        float(v) for v in info[f"{prefix} {name}"].split()
+                    )
+        boxes = {name: values for name, values in boxes.items() if len(values)}
+        return cls(first_page, widths, heights, rotations, boxes)
+
+    def __len__(self) -> int:
+        return len(self.widths)
+
+    @property
+    def pages(self) -> range:
+        return range(self.first_page, self.first_page + len(self))
+
+    def _index(self, page: int) -> int:
+        if page not in self.pages:
+            raise IndexError(f"Page {page} is not in {self.pages}")
+        return page - self.first_page
+
+    def rotation(self, page: int) -> int:
+        return self.rotations[self._index(page)]
+
+    def box(
+        self, page: int, name: str = "MediaBox"
+    ) -> Tuple[float, float, float, float]:
+        """Coordinates (x0, y0, x1, y1) of a box of the page, or None if pdfinfo did not report it"""
+        i = self._index(page)
+        if name not in self.boxes:
+            return None
+        return tuple(self.boxes[name][4 * i : 4 * i + 4])
+
+    def size(
+        self, page: int, box: str = None, rotated: bool = True
+    ) -> Tuple[float, float]:
+        """Size (width, height) of the page, or of one of its boxes, as displayed if rotated
+
+        :param box: Name of the box, defaults to the size reported by pdfinfo
+        :type box: str, optional
+        :param rotated: Swap the sides of pages rotated by 90 or 270 degrees, defaults to True
+        :type rotated: bool, optional
+        """
+        i = self._index(page)
+        if box is not None and box in self.boxes:
+            x0, y0, x1, y1 = self.boxes[box][4 * i : 4 * i + 4]
+            width, height = abs(x1 - x0), abs(y1 - y0)
+        else:
+            width, height = self.widths[i], self.heights[i]
+        if rotated and self.rotations[i] in (90, 270):
+            width, height = height, width
+        return width, height
+
+    def sizes(self, box: str = None, rotated: bool = True) -> List[Tuple[float, float]]:
+        """Size of every indexed page, see size"""
+        return [self.size(page, box, rotated) for page in self.pages]
@@ -0,0 +1,161 @@
+"""
+    pdf2image lazy pages, rendered on first access
+"""
+
+import os
+import threading
+from typing import Callable, List, Sequence, Tuple
+
+from PIL import Image
+
+
+class LazyPage(object):
+    """Handle on one page of a document, rendered when image or array is first accessed
+
+    :param pages: Sequence the page belongs to, it does the rendering
+    :type pages: LazyPages
+    :param page_number: Page number in the document, starting at 1
+    :type page_number: int
+    :param size: Expected (width, height) of the rendered page in pixels, from pdfinfo
+    :type size: Tuple[int, int]
+    """
+
+    def __init__(self, pages: "LazyPages", page_number: int, size: Tuple[int, int]):
+        self.pages = pages
+        self.page_number = page_number
+        self.size = size
+        self._image = None
+
+    @property
+    def width(self) -> int:
+        return self.size[0]
+
+    @property
+    def height(self) -> int:
+        return self.size[1]
+
+    @property
+    def rendered(self) -> bool:
+        return self._image is not None
+
+    @property
+    def image(self) -> Image.Image:
+        """The rendered page, the following pages are rendered in the same poppler call"""
+        if self._image is None:
+            self.pages._render_from(self)
+        return self._image
+
+    @property
+    def array(self):
+        """The rendered page as a NumPy array, requires numpy"""
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("LazyPage.array requires numpy to be installed")
+        return numpy.asarray(self.image)
+
+    def release(self):
+        """Drop the rendered page, it is rendered again on the next access"""
+        self._image = None
+
+    def __repr__(self) -> str:
+        return "<LazyPage {} {}x{}{}>".format(
+            self.page_number,
+            self.width,
+            self.height,
+            " rendered" if self.rendered else "",
+        )
+
+
+class LazyPages(Sequence):
+    """Sequence of LazyPage, returned by convert_from_path and convert_from_bytes with lazy=True
+
+    Accessing a page that is not rendered yet renders it along with up to batch_size - 1
+    following pages that are not rendered either, in a single poppler call, so that
+    iterating over the pages spawns one process per batch rather than per page.
+
+    :param first_page: Number of the first page of the sequence
+    :type first_page: int
+    :param sizes: Expected (width, height) in pixels of each page
+    :type sizes: List[Tuple[int, int]]
+    :param render: Function rendering the pages between its first_page and last_page arguments
+    :type render: Callable
+    """
+
+    batch_size = 4
+
+    def __init__(
+        self,
+        first_page: int,
+        sizes: List[Tuple[int, int]],
+        render: Callable[[int, int], List[Image.Image]],
+    ):
+        self.render_pages = render
+        self.temp_path = None
+        self.lock = threading.Lock()
+        self.pages = [
+            LazyPage(self, first_page + i, size) for i, size in enumerate(sizes)
+        ]
+
+    def __len__(self) -> int:
+        return len(self.pages)
+
+    def __getitem__(self, index):
+        return self.pages[index]
+
+    def _render_run(self, run: List[LazyPage]):
+        images = self.render_pages(run[0].page_number, run[-1].page_number)
+        for page, image in zip(run, images):
+            page._image = image
+
+    def _render_from(self, page: LazyPage):
+        with self.lock:
+            # Another thread may have rendered it while we were waiting
+            if page.rendered:
+                return
+            start = self.pages.index(page)
+            run = [page]
+            for following in self.pages[start + 1 : start + self.batch_size]:
+                if following.rendered:
+                    break
+                run.append(following)
+            self._render_run(run)
+
+    def render(self, pages: List[LazyPage] = None):
+        """Render the given pages, or all of them, adjacent pages share a poppler call
+
+        :param pages: Pages to render, defaults to every page of the sequence
+        :type pages: List[LazyPage], optional
+        """
+        pages = self.pages if pages is None else pages
+        with self.lock:
+            pending = sorted(
+                (page for page in pages if not page.rendered),
+                key=lambda page: page.page_number,
+            )
+            run = []
+            for page in pending:
+                if run and page.page_number != run[-1].page_number + 1:
+                    self._render_run(run)
+                    run = []
+                run.append(page)
+            if run:
+                self._render_run(run)
+
+    def close(self):
+        """Delete the temporary copy of the document made by convert_from_bytes, if any"""
+        if self.temp_path is not None:
+            try:
+                os.remove(self.temp_path)
+            except OSError:
+                pass
+            self.temp_path = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __del__(self):
+        self.close()
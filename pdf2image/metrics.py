@@ -0,0 +1,328 @@
+"""
+    pdf2image optional metrics registry
+
+    Recording is disabled by default and costs a single attribute lookup per
+    call site. Call `enable()` to start collecting, then read the values back
+    with `snapshot()` or `to_prometheus()`.
+"""
+
+import math
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+DEFAULT_LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    math.inf,
+)
+
+
+class _Metric(object):
+    """Base class holding the name, help string and label names of a metric"""
+
+    metric_type = "untyped"
+
+    def __init__(self, registry, name: str, documentation: str, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+
+    def _label_values(self, labels: Dict) -> Tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"Metric {self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+
+class Counter(_Metric):
+    """Monotonically increasing value, optionally split by labels"""
+
+    metric_type = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.values = {}
+
+    def inc(self, amount: float = 1, **labels):
+        if not self.registry.enabled:
+            return
+        key = self._label_values(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self.lock:
+            return self.values.get(self._label_values(labels), 0)
+
+    def reset(self):
+        with self.lock:
+            self.values = {}
+
+    def samples(self) -> List[Dict]:
+        with self.lock:
+            return [
+                {"labels": dict(zip(self.labelnames, key)), "value": value}
+                for key, value in sorted(self.values.items())
+            ]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets, optionally split by labels"""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self, *args, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS, **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+        buckets = sorted(float(b) for b in buckets)
+        if not buckets or buckets[-1] != math.inf:
+            buckets.append(math.inf)
+        self.buckets = tuple(buckets)
+        self.values = {}
+
+    def observe(self, value: float, **labels):
+        if not self.registry.enabled:
+            return
+        key = self._label_values(labels)
+        with self.lock:
+            if key not in self.values:
+                self.values[key] = [[0] * len(self.buckets), 0.0, 0]
+            counts, _, _ = state = self.values[key]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def count(self, **labels) -> int:
+        with self.lock:
+            state = self.values.get(self._label_values(labels))
+            return state[2] if state else 0
+
+    def reset(self):
+        with self.lock:
+            self.values = {}
+
+    def samples(self) -> List[Dict]:
+        with self.lock:
+            samples = []
+            for key, (counts, total, count) in sorted(self.values.items()):
+                cumulative = 0
+                buckets = {}
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    buckets[_format_bound(bound)] = cumulative
+                samples.append(
+                    {
+                        "labels": dict(zip(self.labelnames, key)),
+                        "buckets": buckets,
+                        "sum": total,
+                        "count": count,
+                    }
+                )
+            return samples
+
+
+class MetricsRegistry(object):
+    """Collection of named metrics that can be exported as a dict or in Prometheus text format"""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def _register(self, cls, name: str, documentation: str, labelnames=(), **kwargs):
+        with self.lock:
+            if name in self.metrics:
+                metric = self.metrics[name]
+                if not (
+                    isinstance(metric, cls) and metric.labelnames == tuple(labelnames)
+                ):
+                    raise ValueError(f"Metric {name} is already registered differently")
+                return metric
+            metric = cls(self, name, documentation, labelnames, **kwargs)
+            self.metrics[name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames=(),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(
+            Histogram, name, documentation, labelnames, buckets=buckets
+        )
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        for metric in list(self.metrics.values()):
+            metric.reset()
+
+    def snapshot(self) -> Dict:
+        """Returns the current value of every metric as a JSON serializable dictionary
+
+        :return: Dictionary mapping metric names to their type, help and samples
+        :rtype: Dict
+        """
+        return {
+            name: {
+                "type": metric.metric_type,
+                "help": metric.documentation,
+                "samples": metric.samples(),
+            }
+            for name, metric in sorted(self.metrics.items())
+        }
+
+    def to_prometheus(self) -> str:
+        """Returns the current value of every metric in the Prometheus text exposition format
+
+        :return: Prometheus text exposition (version 0.0.4)
+        :rtype: str
+        """
+        lines = []
+        for name, metric in sorted(self.metrics.items()):
+            lines.append(f"# HELP {name} {_escape_help(metric.documentation)}")
+            lines.append(f"# TYPE {name} {metric.metric_type}")
+            for sample in metric.samples():
+                labels = sample["labels"]
+                if metric.metric_type == "histogram":
+                    for bound, count in sample["buckets"].items():
+                        bucket_labels = dict(labels, le=bound)
+                        lines.append(
+                            f"{name}_bucket{_format_labels(bucket_labels)} {count}"
+                        )
+                    lines.append(
+                        f"{name}_sum{_format_labels(labels)} {_format_value(sample['sum'])}"
+                    )
+                    lines.append(
+                        f"{name}_count{_format_labels(labels)} {sample['count']}"
+                    )
+                else:
+                    lines.append(
+                        f"{name}{_format_labels(labels)} {_format_value(sample['value'])}"
+                    )
+        return "\n".join(lines) + "\n"
+
+
+def _format_bound(bound: float) -> str:
+    if bound == math.inf:
+        return "+Inf"
+    return repr(float(bound))
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for k, v in labels.items():
+        v = str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{k}="{v}"')
+    return "{" + ",".join(parts) + "}"
+
+
+REGISTRY = MetricsRegistry()
+
+PAGES_RENDERED = REGISTRY.counter(
+    "pdf2image_pages_rendered_total", "Number of pages returned by a conversion"
+)
+PAGES_EXTRACTED = REGISTRY.counter(
+    "pdf2image_pages_extracted_total",
+    "Number of pages returned as their embedded image instead of being rendered",
+)
+PAGES_COMPACTED = REGISTRY.counter(
+    "pdf2image_pages_compacted_total",
+    "Number of RGB pages converted to grayscale because they had no color",
+)
+PAGES_SKIPPED_BLANK = REGISTRY.counter(
+    "pdf2image_pages_skipped_blank_total",
+    "Number of blank pages left out with skip_blank",
+)
+BYTES_PRODUCED = REGISTRY.counter(
+    "pdf2image_bytes_produced_total", "Number of encoded bytes produced by poppler"
+)
+PROCESS_SPAWNS = REGISTRY.counter(
+    "pdf2image_process_spawns_total", "Number of poppler processes spawned", ["command"]
+)
+TIMEOUTS = REGISTRY.counter(
+    "pdf2image_timeouts_total", "Number of poppler calls killed after a timeout"
+)
+SYNTAX_ERRORS = REGISTRY.counter(
+    "pdf2image_syntax_errors_total",
+    "Number of renders that reported a PDF syntax error",
+)
+CACHE_HITS = REGISTRY.counter(
+    "pdf2image_cache_hits_total", "Number of pages served from a cache", ["cache"]
+)
+CACHE_MISSES = REGISTRY.counter(
+    "pdf2image_cache_misses_total", "Number of pages not found in a cache", ["cache"]
+)
+QUEUE_WAIT = REGISTRY.histogram(
+    "pdf2image_queue_wait_seconds",
+    "Time spent waiting for a free worker or budget before rendering",
+)
+RENDER_LATENCY = REGISTRY.histogram(
+    "pdf2image_render_seconds",
+    "Wall time of a conversion call",
+    ["fmt", "dpi"],
+)
+
+
+def enable():
+    """Start recording metrics in the default registry"""
+    REGISTRY.enable()
+
+
+def disable():
+    """Stop recording metrics in the default registry"""
+    REGISTRY.disable()
+
+
+def reset():
+    """Clear every value recorded in the default registry"""
+    REGISTRY.reset()
+
+
+def snapshot() -> Dict:
+    """Returns the default registry as a dictionary, see `MetricsRegistry.snapshot`"""
+    return REGISTRY.snapshot()
+
+
+def to_prometheus() -> str:
+    """Returns the default registry in the Prometheus text format, see `MetricsRegistry.to_prometheus`"""
+    return REGISTRY.to_prometheus()
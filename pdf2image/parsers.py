@@ -2,22 +2,23 @@
     pdf2image custom buffer parsers
 """
 
+import struct
 from io import BytesIO
-from typing import List
+from typing import List, Tuple
 
 from PIL import Image
 
 
-def parse_buffer_to_ppm(data: bytes) -> List[Image.Image]:
-    """Parse PPM file bytes to Pillow Image
+def split_ppm_buffer(data: bytes) -> List[bytes]:
+    """Split concatenated PPM files into one bytes object per file
 
     :param data: pdftoppm/pdftocairo output bytes
     :type data: bytes
-    :return: List of PPM images parsed from the output
-    :rtype: List[Image.Image]
+    :return: List of PPM files found in the output
+    :rtype: List[bytes]
     """
 
-    images = []
+    frames = []
 
     index = 0
 
@@ -25,22 +26,22 @@ def parse_buffer_to_ppm(data: bytes) -> List[Image.Image]:
         code, size, rgb = tuple(data[index : index + 40].split(b"\n")[0:3])
         size_x, size_y = tuple(size.split(b" "))
         file_size = len(code) + len(size) + len(rgb) + 3 + int(size_x) * int(size_y) * 3
-        images.append(Image.open(BytesIO(data[index : index + file_size])))
+        frames.append(data[index : index + file_size])
         index += file_size
 
-    return images
+    return frames
 
 
-def parse_buffer_to_pgm(data: bytes) -> List[Image.Image]:
-    """Parse PGM file bytes to Pillow Image
+def split_pgm_buffer(data: bytes) -> List[bytes]:
+    """Split concatenated PGM files into one bytes object per file
 
     :param data: pdftoppm/pdftocairo output bytes
     :type data: bytes
-    :return: List of PGM images parsed from the output
-    :rtype: List[Image.Image]
+    :return: List of PGM files found in the output
+    :rtype: List[bytes]
     """
 
-    images = []
+    frames = []
 
     index = 0
 
@@ -48,39 +49,63 @@ def parse_buffer_to_pgm(data: bytes) -> List[Image.Image]:
         code, size, maxval = tuple(data[index : index + 40].split(b"\n")[0:3])
         size_x, size_y = tuple(size.split(b" "))
         file_size = len(code) + len(size) + len(maxval) + 3 + int(size_x) * int(size_y)
-        images.append(Image.open(BytesIO(data[index : index + file_size])))
+        frames.append(data[index : index + file_size])
         index += file_size
 
-    return images
+    return frames
 
 
-def parse_buffer_to_jpeg(data: bytes) -> List[Image.Image]:
-    """Parse JPEG file bytes to Pillow Image
+def split_pbm_buffer(data: bytes) -> List[bytes]:
+    """Split concatenated PBM files into one bytes object per file
+
+    :param data: pdftoppm -mono output bytes
+    :type data: bytes
+    :return: List of PBM files found in the output
+    :rtype: List[bytes]
+    """
+
+    frames = []
+
+    index = 0
+
+    while index < len(data):
+        code, size = tuple(data[index : index + 40].split(b"\n")[0:2])
+        size_x, size_y = tuple(size.split(b" "))
+        # Each row is padded to a whole number of bytes, 8 pixels per byte
+        file_size = len(code) + len(size) + 2 + (int(size_x) + 7) // 8 * int(size_y)
+        frames.append(data[index : index + file_size])
+        index += file_size
+
+    return frames
+
+
+def split_jpeg_buffer(data: bytes) -> List[bytes]:
+    """Split concatenated JPEG files into one bytes object per file
 
     :param data: pdftoppm/pdftocairo output bytes
     :type data: bytes
-    :return: List of JPEG images parsed from the output
-    :rtype: List[Image.Image]
+    :return: List of JPEG files found in the output
+    :rtype: List[bytes]
     """
 
     return [
-        Image.open(BytesIO(image_data + b"\xff\xd9"))
+        image_data + b"\xff\xd9"
         for image_data in data.split(b"\xff\xd9")[
             :-1
         ]  # Last element is obviously empty
     ]
 
 
-def parse_buffer_to_png(data: bytes) -> List[Image.Image]:
-    """Parse PNG file bytes to Pillow Image
+def split_png_buffer(data: bytes) -> List[bytes]:
+    """Split concatenated PNG files into one bytes object per file
 
     :param data: pdftoppm/pdftocairo output bytes
     :type data: bytes
-    :return: List of PNG images parsed from the output
-    :rtype: List[Image.Image]
+    :return: List of PNG files found in the output
+    :rtype: List[bytes]
     """
 
-    images = []
+    frames = []
 
     c1 = 0
     c2 = 0
@@ -90,9 +115,244 @@ def parse_buffer_to_png(data: bytes) -> List[Image.Image]:
         if data[c2 : c2 + 4] == b"IEND" and (
             c2 + 8 == data_len or data[c2 + 9 : c2 + 12] == b"PNG"
         ):
-            images.append(Image.open(BytesIO(data[c1 : c2 + 8])))
+            frames.append(data[c1 : c2 + 8])
             c1 = c2 + 8
             c2 = c1
         c2 += 1
 
-    return images
+    return frames
+
+
+def parse_buffer_to_ppm(data: bytes) -> List[Image.Image]:
+    """Parse PPM file bytes to Pillow Image
+
+    :param data: pdftoppm/pdftocairo output bytes
+    :type data: bytes
+    :return: List of PPM images parsed from the output
+    :rtype: List[Image.Image]
+    """
+
+    return [Image.open(BytesIO(frame)) for frame in split_ppm_buffer(data)]
+
+
+def parse_buffer_to_pgm(data: bytes) -> List[Image.Image]:
+    """Parse PGM file bytes to Pillow Image
+
+    :param data: pdftoppm/pdftocairo output bytes
+    :type data: bytes
+    :return: List of PGM images parsed from the output
+    :rtype: List[Image.Image]
+    """
+
+    return [Image.open(BytesIO(frame)) for frame in split_pgm_buffer(data)]
+
+
+def parse_buffer_to_pbm(data: bytes) -> List[Image.Image]:
+    """Parse PBM file bytes to Pillow Image
+
+    :param data: pdftoppm -mono output bytes
+    :type data: bytes
+    :return: List of PBM images (mode "1") parsed from the output
+    :rtype: List[Image.Image]
+    """
+
+    return [Image.open(BytesIO(frame)) for frame in split_pbm_buffer(data)]
+
+
+def parse_buffer_to_jpeg(data: bytes) -> List[Image.Image]:
+    """Parse JPEG file bytes to Pillow Image
+
+    :param data: pdftoppm/pdftocairo output bytes
+    :type data: bytes
+    :return: List of JPEG images parsed from the output
+    :rtype: List[Image.Image]
+    """
+
+    return [Image.open(BytesIO(frame)) for frame in split_jpeg_buffer(data)]
+
+
+def parse_buffer_to_png(data: bytes) -> List[Image.Image]:
+    """Parse PNG file bytes to Pillow Image
+
+    :param data: pdftoppm/pdftocairo output bytes
+    :type data: bytes
+    :return: List of PNG images parsed from the output
+    :rtype: List[Image.Image]
+    """
+
+    return [Image.open(BytesIO(frame)) for frame in split_png_buffer(data)]
+
+
+def pbm_to_packed_array(data: bytes):
+    """View of the pixels of a PBM file as a NumPy array of packed bits, requires numpy
+
+    The array has one row per pixel row and (width + 7) // 8 bytes per row, 8 pixels
+    per byte with the first one in the most significant bit, a set bit is black. It
+    shares its memory with data, numpy.unpackbits(array, axis=1)[:, :width] unpacks it.
+
+    :param data: PBM file, as returned with fmt="pbm" and encoded=True
+    :type data: bytes
+    :raises ValueError: Raised if data is not a binary PBM file
+    :return: Array of shape (height, (width + 7) // 8) and type uint8
+    :rtype: numpy.ndarray
+    """
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("pbm_to_packed_array requires numpy to be installed")
+
+    if data[:2] != b"P4":
+        raise ValueError("Not a binary PBM file")
+    width, height = frame_size(data, "pbm")
+    row_bytes = (width + 7) // 8
+    offset = len(data) - row_bytes * height
+    return numpy.frombuffer(data, dtype=numpy.uint8, offset=offset).reshape(
+        height, row_bytes
+    )
+
+
+MIME_TYPES = {
+    "ppm": "image/x-portable-pixmap",
+    "pgm": "image/x-portable-graymap",
+    "pbm": "image/x-portable-bitmap",
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+    "tiff": "image/tiff",
+    "webp": "image/webp",
+    "avif": "image/avif",
+}
+
+
+def frame_format(data: bytes) -> str:
+    """Format of an encoded image, guessed from its signature
+
+    :param data: Encoded image
+    :type data: bytes
+    :raises ValueError: Raised if the format is not one poppler produces
+    :return: One of ppm, pgm, pbm, jpeg, png, tiff, webp and avif
+    :rtype: str
+    """
+
+    if data[:2] == b"\xff\xd8":
+        return "jpeg"
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return "png"
+    if data[:4] in (b"II*\x00", b"MM\x00*"):
+        return "tiff"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    if data[4:12] in (b"ftypavif", b"ftypavis"):
+        return "avif"
+    if data[:2] in (b"P6", b"P3"):
+        return "ppm"
+    if data[:2] in (b"P5", b"P2"):
+        return "pgm"
+    if data[:2] in (b"P4", b"P1"):
+        return "pbm"
+    raise ValueError("Unknown image format")
+
+
+def frame_size(data: bytes, fmt: str = None) -> Tuple[int, int]:
+    """Size (width, height) of an encoded image, read from its header without decoding it
+
+    :param data: Encoded image
+    :type data: bytes
+    :param fmt: Format of the image, guessed when None, defaults to None
+    :type fmt: str, optional
+    :return: Width and height in pixels
+    :rtype: Tuple[int, int]
+    """
+
+    fmt = fmt or frame_format(data)
+    if fmt in ("ppm", "pgm", "pbm"):
+        # Magic number, width and height, separated by whitespace and comments
+        tokens = []
+        for line in data[:1024].split(b"\n"):
+            tokens += line.split(b"#")[0].split()
+            if len(tokens) >= 3:
+                return int(tokens[1]), int(tokens[2])
+    elif fmt == "png":
+        return struct.unpack(">II", data[16:24])
+    elif fmt == "jpeg":
+        index = 2
+        while index + 9 < len(data):
+            marker = data[index + 1]
+            (length,) = struct.unpack(">H", data[index + 2 : index + 4])
+            # Start of frame markers, except DHT, JPG and DAC
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack(">HH", data[index + 5 : index + 9])
+                return width, height
+            index += 2 + length
+    elif fmt == "tiff":
+        endian = "<" if data[:2] == b"II" else ">"
+        (offset,) = struct.unpack(endian + "I", data[4:8])
+        (count,) = struct.unpack(endian + "H", data[offset : offset + 2])
+        size = {}
+        for i in range(count):
+            entry = data[offset + 2 + 12 * i : offset + 14 + 12 * i]
+            tag, field_type = struct.unpack(endian + "HH", entry[:4])
+            if tag in (256, 257):
+                # SHORT or LONG
+                value_format = "H" if field_type == 3 else "I"
+                size[tag] = struct.unpack(
+                    endian + value_format, entry[8 : 8 + struct.calcsize(value_format)]
+                )[0]
+        if len(size) == 2:
+            return size[256], size[257]
+    elif fmt == "webp":
+        chunk = data[12:16]
+        if chunk == b"VP8X":
+            # Canvas size minus one, 24 bits little endian each
+            width = int.from_bytes(data[24:27], "little") + 1
+            height = int.from_bytes(data[27:30], "little") + 1
+            return width, height
+        if chunk == b"VP8L":
+            # Width and height minus one, 14 bits each after the 0x2f signature
+            (bits,) = struct.unpack("<I", data[21:25])
+            return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if chunk == b"VP8 ":
+            # After the frame tag and the 9d 01 2a start code
+            width, height = struct.unpack("<HH", data[26:30])
+            return width & 0x3FFF, height & 0x3FFF
+    elif fmt == "avif":
+        # Image spatial extents property: box header, version and flags, width, height
+        index = data.find(b"ispe")
+        if index >= 0:
+            return struct.unpack(">II", data[index + 8 : index + 16])
+    raise ValueError(f"Unable to read the size of the {fmt} image")
+
+
+class EncodedPage(object):
+    """A page as poppler encoded it, returned by convert_from_path with encoded=True
+
+    :param page_number: Page number in the document, starting at 1
+    :type page_number: int
+    :param data: Encoded image (PPM, PGM, PBM, JPEG, PNG, TIFF, WebP or AVIF)
+    :type data: bytes
+    """
+
+    def __init__(self, page_number: int, data: bytes):
+        self.page_number = page_number
+        self.data = data
+        self.fmt = frame_format(data)
+        self.width, self.height = frame_size(data, self.fmt)
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return self.width, self.height
+
+    @property
+    def mime_type(self) -> str:
+        return MIME_TYPES[self.fmt]
+
+    def open(self) -> Image.Image:
+        """Decode the page with Pillow"""
+        return Image.open(BytesIO(self.data))
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __repr__(self) -> str:
+        return "<EncodedPage {} {} {}x{} {} bytes>".format(
+            self.page_number, self.fmt, self.width, self.height, len(self.data)
+        )
@@ -3,24 +3,45 @@
     PDFs into Pillow images.
 """
 
+import functools
+import math
 import os
 import platform
+from collections import deque
+from contextlib import contextmanager
+from io import BytesIO
+from itertools import accumulate, repeat
 import tempfile
 import types
 import shutil
 import subprocess
-from subprocess import Popen, PIPE, TimeoutExpired
-from typing import Any, Union, Tuple, List, Dict, Callable
+import time
+from concurrent.futures import ThreadPoolExecutor
+from subprocess import Popen, PIPE, DEVNULL, TimeoutExpired
+from typing import Any, Union, Tuple, List, Dict, Callable, Iterator
 from pathlib import PurePath
 from PIL import Image
 
+from pdf2image import metrics
+from pdf2image.analysis import is_blank, is_grayscale
+from pdf2image.cache import PageCache, RenderCache, document_hash, page_key
+from pdf2image.geometry import PageGeometry
+from pdf2image.lazy import LazyPages
+from pdf2image.store import CompressedPages, PageList, compress_frame
 from pdf2image.generators import uuid_generator, counter_generator, ThreadSafeGenerator
 
 from pdf2image.parsers import (
+    EncodedPage,
+    parse_buffer_to_pbm,
     parse_buffer_to_pgm,
     parse_buffer_to_ppm,
     parse_buffer_to_jpeg,
     parse_buffer_to_png,
+    split_pbm_buffer,
+    split_pgm_buffer,
+    split_ppm_buffer,
+    split_jpeg_buffer,
+    split_png_buffer,
 )
 
 from pdf2image.exceptions import (
@@ -32,11 +53,50 @@ from pdf2image.exceptions import (
 
 TRANSPARENT_FILE_TYPES = ["png", "tiff"]
 PDFINFO_CONVERT_TO_INT = ["Pages"]
+# dpi="native" renders pages without images at NATIVE_DPI_DEFAULT, and by default
+# never above NATIVE_DPI_LIMIT (the max_dpi parameter)
+NATIVE_DPI_DEFAULT = 200
+NATIVE_DPI_LIMIT = 600
+# Fraction of the page an image must cover for its resolution to be used
+NATIVE_DPI_MIN_COVERAGE = 0.5
+# Encodings of embedded images that pdfimages -all writes in a format Pillow reads
+EXTRACTABLE_ENCODINGS = ["jpeg", "image"]
+# Color spaces of embedded images returned as is, pdfimages writes CMYK images as
+# CMYK JPEG or TIFF files, ICC based images qualify when they have 1 or 3 components
+EXTRACTABLE_COLORS = ["gray", "rgb", "icc"]
+# How far the drawn size of an image may be from the page size to count as full-page
+FULL_PAGE_TOLERANCE = 0.02
+# Resolution of the render used to find blank pages, enough to see a line of body text
+BLANK_PROBE_DPI = 36
+# Memory backed folder holding the temporary output of pdftocairo when it has room
+TMPFS_DIR = "/dev/shm"
+# Rendering options of each quality, draft skips anti-aliasing, high also anti-aliases thin lines
+QUALITY_PRESETS = {
+    "draft": {
+        "pdftoppm": ["-aa", "no", "-aaVector", "no"],
+        "pdftocairo": ["-antialias", "none"],
+    },
+    "normal": {"pdftoppm": [], "pdftocairo": []},
+    "high": {
+        "pdftoppm": ["-aa", "yes", "-aaVector", "yes", "-thinlinemode", "shape"],
+        "pdftocairo": ["-antialias", "best"],
+    },
+}
+# Version of each (command, poppler_path), looked up once per process
+_poppler_versions = {}
+
+SPLIT_BUFFER_FUNCS = {
+    "ppm": split_ppm_buffer,
+    "pgm": split_pgm_buffer,
+    "pbm": split_pbm_buffer,
+    "jpeg": split_jpeg_buffer,
+    "png": split_png_buffer,
+}
 
 
 def convert_from_path(
     pdf_path: Union[str, PurePath],
-    dpi: int = 200,
+    dpi: Union[int, str] = 200,
     output_folder: Union[str, PurePath] = None,
     first_page: int = None,
     last_page: int = None,
@@ -57,20 +117,36 @@ def convert_from_path(
     use_pdftocairo: bool = False,
     timeout: int = None,
     hide_annotations: bool = False,
-) -> List[Image.Image]:
+    max_memory: int = None,
+    max_temp_disk: int = None,
+    cache: RenderCache = None,
+    page_cache: PageCache = None,
+    lazy: bool = False,
+    region: Tuple[int, int, int, int] = None,
+    antialias: bool = None,
+    target_pixels: int = None,
+    max_dimension: int = None,
+    extract_images: bool = False,
+    encoded: bool = False,
+    compressed: bool = False,
+    quality: str = None,
+    auto_grayscale: bool = False,
+    skip_blank: bool = False,
+    max_dpi: int = NATIVE_DPI_LIMIT,
+) -> Union[List[Image.Image], List[EncodedPage], CompressedPages, LazyPages, PageList]:
     """Function wrapping pdftoppm and pdftocairo
 
     :param pdf_path: Path to the PDF that you want to convert
     :type pdf_path: Union[str, PurePath]
-    :param dpi: Image quality in DPI (default 200), defaults to 200
-    :type dpi: int, optional
+    :param dpi: Image quality in DPI (default 200), or "native" to render each page at the resolution of its largest embedded image, defaults to 200
+    :type dpi: Union[int, str], optional
     :param output_folder: Write the resulting images to a folder (instead of directly in memory), defaults to None
     :type output_folder: Union[str, PurePath], optional
     :param first_page: First page to process, defaults to None
     :type first_page: int, optional
     :param last_page: Last page to process before stopping, defaults to None
     :type last_page: int, optional
-    :param fmt: Output image format, defaults to "ppm"
+    :param fmt: Output image format (ppm, jpeg, png, tiff, or pbm for 1-bit black and white pages, also named mono), defaults to "ppm"
     :type fmt: str, optional
     :param jpegopt: jpeg options `quality`, `progressive`, and `optimize` (only for jpeg format), defaults to None
     :type jpegopt: Dict, optional
@@ -104,13 +180,135 @@ def convert_from_path(
     :type timeout: int, optional
     :param hide_annotations: Hide PDF annotations in the output, defaults to False
     :type hide_annotations: bool, optional
-    :raises NotImplementedError: Raised when conflicting parameters are given (hide_annotations for pdftocairo)
+    :param max_memory: Memory budget in bytes, pages are rendered in smaller batches and spilled to temporary files to stay under it, defaults to None
+    :type max_memory: int, optional
+    :param max_temp_disk: Disk budget in bytes of the temporary folder used by pdftocairo when there is no output_folder, /dev/shm is used when it has that much free space, defaults to None
+    :type max_temp_disk: int, optional
+    :param cache: Render cache consulted before spawning poppler and filled with the rendered pages, ignored with output_folder, defaults to None
+    :type cache: RenderCache, optional
+    :param page_cache: In-memory cache of decoded pages consulted before the render cache, ignored with output_folder, defaults to None
+    :type page_cache: PageCache, optional
+    :param lazy: Return LazyPage handles that render on first access instead of rendering every page now, defaults to False
+    :type lazy: bool, optional
+    :param region: Area (x, y, width, height) in pixels to render on each page instead of the whole page, see also render_region, defaults to None
+    :type region: Tuple[int, int, int, int], optional
+    :param antialias: Anti-alias fonts and vector graphics, False is the same as quality="draft", cannot be combined with quality, defaults to None
+    :type antialias: bool, optional
+    :param target_pixels: Pick the dpi of each page so that it has at most this many pixels, replaces dpi, defaults to None
+    :type target_pixels: int, optional
+    :param max_dimension: Pick the dpi of each page so that its longest side has at most this many pixels, replaces dpi, defaults to None
+    :type max_dimension: int, optional
+    :param extract_images: Return the embedded image of pages made of a single full-page JPEG or raw image, as is and at its own resolution, instead of rendering them, ignored with output_folder, size, region and lazy, defaults to False
+    :type extract_images: bool, optional
+    :param encoded: Return the pages as poppler encoded them (EncodedPage), without decoding them with Pillow, ignored with output_folder and lazy, defaults to False
+    :type encoded: bool, optional
+    :param compressed: Return a CompressedPages sequence that keeps the pages compressed in memory and decodes them on access, uncompressed formats are re-encoded as PNG, ignored with output_folder and lazy, defaults to False
+    :type compressed: bool, optional
+    :param quality: Rendering quality preset, "draft" (no anti-aliasing, fastest), "normal" or "high" (anti-aliased thin lines), defaults to None ("normal")
+    :type quality: str, optional
+    :param auto_grayscale: Convert the pages without color to grayscale (mode "L"), the mode of each page tells whether it was, ignored with grayscale, output_folder, encoded and compressed, defaults to False
+    :type auto_grayscale: bool, optional
+    :param skip_blank: Leave out the blank pages, found on a low resolution render of the document, the result is then a PageList (or CompressedPages) telling which pages were skipped, ignored with lazy, defaults to False
+    :type skip_blank: bool, optional
+    :param max_dpi: Highest resolution dpi="native" renders a page at, defaults to 600
+    :type max_dpi: int, optional
+    :raises ValueError: Raised when quality is not one of the presets, or is combined with antialias
+    :raises NotImplementedError: Raised when conflicting parameters are given (hide_annotations or fmt="pbm" for pdftocairo)
     :raises PDFPopplerTimeoutError: Raised after the timeout for the image processing is exceeded
     :raises PDFSyntaxError: Raised if there is a syntax error in the PDF and strict=True
-    :return: A list of Pillow images, one for each page between first_page and last_page
-    :rtype: List[Image.Image]
+    :return: A list of Pillow images, one for each page between first_page and last_page, EncodedPage objects if encoded is True, CompressedPages if compressed is True, LazyPages if lazy is True, PageList if skip_blank is True
+    :rtype: Union[List[Image.Image], List[EncodedPage], CompressedPages, LazyPages, PageList]
+    """
+    return _convert_from_path(
+        pdf_path,
+        dpi=dpi,
+        output_folder=output_folder,
+        first_page=first_page,
+        last_page=last_page,
+        fmt=fmt,
+        jpegopt=jpegopt,
+        thread_count=thread_count,
+        userpw=userpw,
+        ownerpw=ownerpw,
+        use_cropbox=use_cropbox,
+        strict=strict,
+        transparent=transparent,
+        single_file=single_file,
+        output_file=output_file,
+        poppler_path=poppler_path,
+        grayscale=grayscale,
+        size=size,
+        paths_only=paths_only,
+        use_pdftocairo=use_pdftocairo,
+        timeout=timeout,
+        hide_annotations=hide_annotations,
+        max_memory=max_memory,
+        max_temp_disk=max_temp_disk,
+        cache=cache,
+        page_cache=page_cache,
+        lazy=lazy,
+        region=region,
+        antialias=antialias,
+        target_pixels=target_pixels,
+        max_dimension=max_dimension,
+        extract_images=extract_images,
+        encoded=encoded,
+        compressed=compressed,
+        quality=quality,
+        auto_grayscale=auto_grayscale,
+        skip_blank=skip_blank,
+        max_dpi=max_dpi,
+    )
+
+
+def _convert_from_path(
+    pdf_path: Union[str, PurePath],
+    dpi: Union[int, str] = 200,
+    output_folder: Union[str, PurePath] = None,
+    first_page: int = None,
+    last_page: int = None,
+    fmt: str = "ppm",
+    jpegopt: Dict = None,
+    thread_count: int = 1,
+    userpw: str = None,
+    ownerpw: str = None,
+    use_cropbox: bool = False,
+    strict: bool = False,
+    transparent: bool = False,
+    single_file: bool = False,
+    output_file: Any = uuid_generator(),
+    poppler_path: Union[str, PurePath] = None,
+    grayscale: bool = False,
+    size: Union[Tuple, int] = None,
+    paths_only: bool = False,
+    use_pdftocairo: bool = False,
+    timeout: int = None,
+    hide_annotations: bool = False,
+    max_memory: int = None,
+    max_temp_disk: int = None,
+    cache: RenderCache = None,
+    page_cache: PageCache = None,
+    lazy: bool = False,
+    region: Tuple[int, int, int, int] = None,
+    antialias: bool = None,
+    target_pixels: int = None,
+    max_dimension: int = None,
+    extract_images: bool = False,
+    encoded: bool = False,
+    compressed: bool = False,
+    quality: str = None,
+    auto_grayscale: bool = False,
+    skip_blank: bool = False,
+    max_dpi: int = NATIVE_DPI_LIMIT,
+    page_count: int = None,
+    poppler_version: Tuple[int, int] = None,
+) -> Union[List[Image.Image], List[EncodedPage], CompressedPages, LazyPages, PageList]:
+    """Body of convert_from_path, nested calls pass the page count and poppler version
+    already known to the outer call
     """
 
+    start_time = time.perf_counter()
+
     if use_pdftocairo and fmt == "ppm":
         fmt = "png"
 
@@ -124,10 +322,6 @@ def convert_from_path(
     if isinstance(poppler_path, PurePath):
         poppler_path = poppler_path.as_posix()
 
-    page_count = pdfinfo_from_path(
-        pdf_path, userpw, ownerpw, poppler_path=poppler_path
-    )["Pages"]
-
     # We start by getting the output format, the buffer processing function and if we need pdftocairo
     parsed_fmt, final_extension, parse_buffer_func, use_pdfcairo_format = _parse_format(
         fmt, grayscale
@@ -140,9 +334,11 @@ def convert_from_path(
         or (transparent and parsed_fmt in TRANSPARENT_FILE_TYPES)
     )
 
-    poppler_version_major, poppler_version_minor = _get_poppler_version(
-        "pdftocairo" if use_pdfcairo else "pdftoppm", poppler_path=poppler_path
-    )
+    if poppler_version is None:
+        poppler_version = _get_poppler_version(
+            "pdftocairo" if use_pdfcairo else "pdftoppm", poppler_path=poppler_path
+        )
+    poppler_version_major, poppler_version_minor = poppler_version
 
     if poppler_version_major == 0 and poppler_version_minor <= 57:
         jpegopt = None
@@ -155,7 +351,8 @@ def convert_from_path(
         output_file, ThreadSafeGenerator
     ):
         if single_file:
-            output_file = iter([output_file])
+            # Nested calls must see a generator too, not wrap it a second time
+            output_file = ThreadSafeGenerator(repeat(output_file))
             thread_count = 1
         else:
             output_file = counter_generator(output_file)
@@ -166,117 +363,596 @@ def convert_from_path(
     if first_page is None or first_page < 1:
         first_page = 1
 
-    if last_page is None or last_page > page_count:
+    # Compressed pages are encoded pages compressed as they come out of poppler
+    compressed = compressed and not lazy and output_folder is None
+    encoded = (encoded or compressed) and not lazy and output_folder is None
+    auto_grayscale = (
+        auto_grayscale and not grayscale and output_folder is None and not encoded
+    )
+    if encoded:
+        # The page cache holds decoded pages
+        page_cache = None
+
+    if use_pdfcairo and hide_annotations:
+        raise NotImplementedError(
+            "Hide annotations flag not implemented in pdftocairo."
+        )
+
+    if use_pdfcairo and parsed_fmt == "pbm":
+        raise NotImplementedError("PBM output not implemented in pdftocairo.")
+
+    if antialias is not None and quality is not None:
+        raise ValueError(
+            'antialias and quality cannot be combined, antialias=False is quality="draft"'
+        )
+    if quality is None:
+        quality = "draft" if antialias is False else "normal"
+    if quality not in QUALITY_PRESETS:
+        raise ValueError(
+            f"Unknown quality {quality}, expected one of {list(QUALITY_PRESETS)}"
+        )
+
+    cache_key = None
+    if (cache is not None or page_cache is not None) and output_folder is None:
+        pdf_hash = document_hash(pdf_path)
+        cache_key = functools.partial(
+            page_key,
+            pdf_hash,
+            dpi=dpi,
+            fmt=parsed_fmt,
+            jpegopt=jpegopt,
+            use_cropbox=use_cropbox,
+            transparent=transparent,
+            grayscale=grayscale,
+            size=size,
+            hide_annotations=hide_annotations,
+            region=region,
+            quality=quality,
+            auto_grayscale=auto_grayscale,
+            renderer="pdftocairo" if use_pdfcairo else "pdftoppm",
+            poppler_version=(poppler_version_major, poppler_version_minor),
+        )
+
+    # A page range found entirely in the page cache needs no pdfinfo call
+    if page_count is None and not (
+        cache_key is not None
+        and page_cache is not None
+        and last_page is not None
+        and first_page <= last_page
+        and not (
+            lazy
+            or dpi == "native"
+            or target_pixels is not None
+            or max_dimension is not None
+            or extract_images
+            or skip_blank
+        )
+        and all(
+            cache_key(page=page) in page_cache
+            for page in (
+                [first_page] if single_file else range(first_page, last_page + 1)
+            )
+        )
+    ):
+        page_count = pdfinfo_from_path(
+            pdf_path, userpw, ownerpw, poppler_path=poppler_path
+        )["Pages"]
+
+    if page_count is not None and (last_page is None or last_page > page_count):
         last_page = page_count
 
     if first_page > last_page:
-        return []
+        if lazy:
+            return LazyPages(first_page, [], None)
+        if compressed:
+            return CompressedPages([], [] if skip_blank else None)
+        return PageList([], [], []) if skip_blank else []
+
+    extract_images = (
+        extract_images
+        and not lazy
+        and output_folder is None
+        and size is None
+        and region is None
+        # Converting the embedded image to grayscale or bilevel would decode it
+        and not (encoded and (grayscale or parsed_fmt == "pbm"))
+    )
+    skip_blank = skip_blank and not lazy
+    page_dpis = None
+    native_dpi = dpi == "native"
+    if (
+        lazy
+        or native_dpi
+        or target_pixels is not None
+        or max_dimension is not None
+        or extract_images
+        or skip_blank
+    ):
+        # Lazy pages and per page resolutions are rendered by nested calls
+        render = functools.partial(
+            _convert_from_path,
+            pdf_path,
+            dpi=dpi,
+            output_folder=output_folder,
+            fmt=fmt,
+            jpegopt=jpegopt,
+            thread_count=thread_count,
+            userpw=userpw,
+            ownerpw=ownerpw,
+            use_cropbox=use_cropbox,
+            strict=strict,
+            transparent=transparent,
+            single_file=single_file,
+            output_file=output_file,
+            poppler_path=poppler_path,
+            grayscale=grayscale,
+            size=size,
+            paths_only=paths_only,
+            use_pdftocairo=use_pdftocairo,
+            timeout=timeout,
+            hide_annotations=hide_annotations,
+            max_memory=max_memory,
+            max_temp_disk=max_temp_disk,
+            cache=cache,
+            page_cache=page_cache,
+            region=region,
+            encoded=encoded,
+            compressed=compressed,
+            quality=quality,
+            auto_grayscale=auto_grayscale,
+            max_dpi=max_dpi,
+            page_count=page_count,
+            poppler_version=(poppler_version_major, poppler_version_minor),
+        )
+        if single_file:
+            last_page = first_page
+        geometry = page_geometry_from_path(
+            pdf_path, first_page, last_page, userpw, ownerpw, poppler_path
+        )
+        page_sizes = geometry.sizes("CropBox" if use_cropbox else "MediaBox")
+        if native_dpi:
+            page_dpis = _native_dpis(
+                pdf_path,
+                first_page,
+                page_sizes,
+                userpw,
+                ownerpw,
+                poppler_path,
+                timeout,
+                max_dpi,
+            )
+        if target_pixels is not None or max_dimension is not None:
+            auto_dpis = [
+                _auto_dpi(width, height, target_pixels, max_dimension)
+                for width, height in page_sizes
+            ]
+            page_dpis = [min(d) for d in zip(page_dpis or auto_dpis, auto_dpis)]
+        blank_pages = []
+        if skip_blank:
+            blank_pages = _blank_pages(
+                pdf_path,
+                first_page,
+                last_page,
+                thread_count,
+                userpw,
+                ownerpw,
+                use_cropbox,
+                poppler_path,
+                timeout,
+                hide_annotations,
+                page_count,
+                # The probes are rendered by pdftoppm
+                None if use_pdfcairo else poppler_version,
+            )
+
+    if lazy:
+        if region is not None:
+            sizes = [tuple(region[2:]) for _ in page_sizes]
+        else:
+            sizes = [
+                _page_pixel_size(width, height, page_dpi, size)
+                for (width, height), page_dpi in zip(
+                    page_sizes, page_dpis or [dpi] * len(page_sizes)
+                )
+            ]
+        return LazyPages(
+            first_page,
+            sizes,
+            lambda first, last: render(
+                first_page=first,
+                last_page=last,
+                target_pixels=target_pixels,
+                max_dimension=max_dimension,
+            ),
+        )
+
+    if page_dpis is not None or extract_images or skip_blank:
+        pages = list(range(first_page, last_page + 1))
+        page_dpis = page_dpis or [dpi] * len(pages)
+        rendered = {}
+        if extract_images:
+            for page, frame in _extract_full_page_images(
+                pdf_path,
+                geometry,
+                "CropBox" if use_cropbox else "MediaBox",
+                userpw,
+                ownerpw,
+                poppler_path,
+                timeout,
+            ).items():
+                if page in blank_pages:
+                    continue
+                if encoded:
+                    rendered[page] = EncodedPage(page, frame)
+                else:
+                    image = Image.open(BytesIO(frame))
+                    if parsed_fmt == "pbm":
+                        image = image.convert("1")
+                    elif grayscale:
+                        image = image.convert("L")
+                    elif auto_grayscale:
+                        image = _compact_grayscale(image)
+                    rendered[page] = image
+                metrics.PAGES_EXTRACTED.inc()
+        # Pages with the same resolution share a poppler call when they are adjacent
+        jobs = []
+        for page_dpi in sorted(set(page_dpis)):
+            for run_first_page, run_last_page in _page_runs(
+                [
+                    page
+                    for page, d in zip(pages, page_dpis)
+                    if d == page_dpi
+                    and page not in rendered
+                    and page not in blank_pages
+                ]
+            ):
+                jobs += [
+                    (job_first_page, job_last_page, page_dpi)
+                    for job_first_page, job_last_page in _split_pages(
+                        run_first_page,
+                        run_last_page,
+                        min(thread_count, run_last_page - run_first_page + 1),
+                    )
+                ]
+        # Up to thread_count poppler processes run at once, sharing the budgets
+        workers = max(min(thread_count, len(jobs)), 1)
+        with ThreadPoolExecutor(workers) as executor:
+            futures = [
+                executor.submit(
+                    render,
+                    first_page=job_first_page,
+                    last_page=job_last_page,
+                    dpi=page_dpi,
+                    thread_count=1,
+                    max_memory=None if max_memory is None else max_memory // workers,
+                    max_temp_disk=(
+                        None if max_temp_disk is None else max_temp_disk // workers
+                    ),
+                )
+                for job_first_page, job_last_page, page_dpi in jobs
+            ]
+            for (job_first_page, job_last_page, _), future in zip(jobs, futures):
+                images = future.result()
+                if compressed:
+                    # Each frame was compressed as it came out of poppler
+                    images = images.pages
+                rendered.update(zip(range(job_first_page, job_last_page + 1), images))
+        pages = [page for page in pages if page not in blank_pages]
+        images = [rendered[page] for page in pages]
+        if compressed:
+            return CompressedPages(images, blank_pages if skip_blank else None)
+        return PageList(images, pages, blank_pages) if skip_blank else images
 
     try:
         auto_temp_dir = False
-        if output_folder is None and use_pdfcairo:
-            output_folder = tempfile.mkdtemp()
-            auto_temp_dir = True
 
-        # Recalculate page count based on first and last page
-        page_count = last_page - first_page + 1
-
-        if thread_count > page_count:
-            thread_count = page_count
-
-        reminder = page_count % thread_count
-        current_page = first_page
-        processes = []
-        for _ in range(thread_count):
-            thread_output_file = next(output_file)
-
-            # Get the number of pages the thread will be processing
-            thread_page_count = page_count // thread_count + int(reminder > 0)
-            # Build the command accordingly
-            args = _build_command(
-                ["-r", str(dpi), pdf_path],
-                output_folder,
-                current_page,
-                current_page + thread_page_count - 1,
-                parsed_fmt,
-                jpegopt,
-                thread_output_file,
+        # -singlefile only ever renders the first page
+        pages = [first_page] if single_file else list(range(first_page, last_page + 1))
+
+        # Look the pages up in the caches, only the missing ones get rendered
+        cached = {}
+        cache_keys = {}
+        if cache_key is not None:
+            for page in pages:
+                cache_keys[page] = cache_key(page=page)
+                if page_cache is not None:
+                    image = page_cache.get(cache_keys[page])
+                    if image is not None:
+                        cached[page] = image
+                        continue
+                if cache is not None:
+                    frame = cache.get(cache_keys[page])
+                    if frame is not None:
+                        if encoded:
+                            cached[page] = (
+                                compress_frame(frame) if compressed else frame
+                            )
+                        else:
+                            cached[page] = _open_frame(
+                                frame, auto_grayscale=auto_grayscale
+                            )
+                        if page_cache is not None:
+                            cached[page].load()
+                            page_cache.put(
+                                cache_keys[page], cached[page], pdf_hash, pdf_path
+                            )
+                            cached[page] = cached[page].copy()
+        pages_to_render = [page for page in pages if page not in cached]
+        render_cache_keys = None
+        if cache is not None and cache_keys:
+            render_cache_keys = [cache_keys[page] for page in pages_to_render]
+
+        if thread_count > len(pages_to_render):
+            thread_count = max(len(pages_to_render), 1)
+
+        inflight_budget = retained_budget = None
+        if max_memory is not None:
+            # Half of the budget bounds the output of the running processes,
+            # the other half bounds the pages we keep in memory
+            inflight_budget = max_memory // 2
+            retained_budget = max_memory - inflight_budget
+        if max_temp_disk is not None and output_folder is None and use_pdfcairo:
+            if inflight_budget is None or max_temp_disk < inflight_budget:
+                inflight_budget = max_temp_disk
+
+        # The decoded size of the pages bounds the memory budget chunks and the output
+        # pdftocairo writes to the temporary folder
+        page_bytes = None
+        if pages_to_render and (
+            (inflight_budget is not None and not single_file)
+            or (output_folder is None and use_pdfcairo and os.path.isdir(TMPFS_DIR))
+        ):
+            # Bilevel pages are decoded with one byte per pixel
+            channels = 1 if grayscale or parsed_fmt == "pbm" else 3
+            if transparent and parsed_fmt in TRANSPARENT_FILE_TYPES:
+                channels = 4
+            page_sizes = _pdfinfo_page_sizes(
+                pdf_path,
+                first_page,
+                last_page,
                 userpw,
                 ownerpw,
+                poppler_path,
                 use_cropbox,
-                transparent,
-                single_file,
-                grayscale,
-                size,
-                hide_annotations,
             )
-
-            if use_pdfcairo:
-                if hide_annotations:
-                    raise NotImplementedError(
-                        "Hide annotations flag not implemented in pdftocairo."
-                    )
-                args = [_get_command_path("pdftocairo", poppler_path)] + args
-            else:
-                args = [_get_command_path("pdftoppm", poppler_path)] + args
-
-            # Update page values
-            current_page = current_page + thread_page_count
-            reminder -= int(reminder > 0)
-            # Add poppler path to LD_LIBRARY_PATH
-            env = os.environ.copy()
-            if poppler_path is not None:
-                env["LD_LIBRARY_PATH"] = (
-                    poppler_path + ":" + env.get("LD_LIBRARY_PATH", "")
+            page_bytes = {
+                page: _estimate_page_bytes(
+                    *page_sizes[page - first_page], dpi, size, channels
                 )
-            # Spawn the process and save its uuid
-            startupinfo = None
-            if platform.system() == "Windows":
-                # this startupinfo structure prevents a console window from popping up on Windows
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            processes.append(
-                (
-                    thread_output_file,
-                    Popen(
-                        args, env=env, stdout=PIPE, stderr=PIPE, startupinfo=startupinfo
-                    ),
+                if region is None
+                else region[2] * region[3] * channels
+                for page in pages_to_render
+            }
+
+        if inflight_budget is None or single_file or not pages_to_render:
+            chunks = [
+                chunk
+                for run_first_page, run_last_page in _page_runs(pages_to_render)
+                for chunk in _split_pages(
+                    run_first_page,
+                    run_last_page,
+                    min(thread_count, run_last_page - run_first_page + 1),
+                )
+            ]
+            chunk_bytes = [0] * len(chunks)
+            cumulative_bytes = None
+            retained_budget = None
+        else:
+            # The stdout of a chunk is held while it is split into pages, so the
+            # output read from a pipe is in memory twice
+            copies = 2 if output_folder is None and not use_pdfcairo else 1
+            chunks = [
+                chunk
+                for run_first_page, run_last_page in _page_runs(pages_to_render)
+                for chunk in _split_pages_by_budget(
+                    run_first_page,
+                    [
+                        page_bytes[page] * copies
+                        for page in range(run_first_page, run_last_page + 1)
+                    ],
+                    inflight_budget // thread_count,
                 )
+            ]
+            chunk_bytes = [
+                sum(page_bytes[page] * copies for page in range(f, l + 1))
+                for f, l in chunks
+            ]
+            cumulative_bytes = list(
+                accumulate(page_bytes[page] for page in pages_to_render)
             )
 
-        images = []
-
-        for uid, proc in processes:
-            try:
-                data, err = proc.communicate(timeout=timeout)
-            except TimeoutExpired:
-                proc.kill()
-                outs, errs = proc.communicate()
-                raise PDFPopplerTimeoutError("Run poppler timeout.")
+        if output_folder is None and use_pdfcairo:
+            required_bytes = None
+            if page_bytes is not None:
+                required_bytes = sum(page_bytes.values())
+                if max_temp_disk is not None:
+                    required_bytes = min(required_bytes, max_temp_disk)
+            output_folder = _make_auto_temp_dir(required_bytes)
+            auto_temp_dir = True
 
-            if b"Syntax Error" in err and strict:
-                raise PDFSyntaxError(err.decode("utf8", "ignore"))
+        command = "pdftocairo" if use_pdfcairo else "pdftoppm"
+        render_args = ["-r", str(dpi)] + QUALITY_PRESETS[quality][command]
+        # Add poppler path to LD_LIBRARY_PATH
+        env = os.environ.copy()
+        if poppler_path is not None:
+            env["LD_LIBRARY_PATH"] = poppler_path + ":" + env.get("LD_LIBRARY_PATH", "")
+        startupinfo = None
+        if platform.system() == "Windows":
+            # this startupinfo structure prevents a console window from popping up on Windows
+            startupinfo = subprocess.STARTUPINFO()
+            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+
+        queued_at = time.perf_counter()
+        processes = deque()
+        images = []
+        inflight_bytes = 0
+        next_chunk = 0
+        while next_chunk < len(chunks) or processes:
+            # Start chunks while we have threads left and they fit in the memory budget,
+            # a chunk larger than the budget still runs, but alone
+            while (
+                next_chunk < len(chunks)
+                and len(processes) < thread_count
+                and (
+                    inflight_budget is None
+                    or not processes
+                    or inflight_bytes + chunk_bytes[next_chunk] <= inflight_budget
+                )
+            ):
+                chunk_first_page, chunk_last_page = chunks[next_chunk]
+                thread_output_file = next(output_file)
+                # Build the command accordingly
+                args = _build_command(
+                    render_args + [pdf_path],
+                    output_folder,
+                    chunk_first_page,
+                    chunk_last_page,
+                    parsed_fmt,
+                    jpegopt,
+                    thread_output_file,
+                    userpw,
+                    ownerpw,
+                    use_cropbox,
+                    transparent,
+                    single_file,
+                    grayscale,
+                    size,
+                    hide_annotations,
+                    region,
+                )
+                args = [_get_command_path(command, poppler_path)] + args
+
+                metrics.QUEUE_WAIT.observe(time.perf_counter() - queued_at)
+                # We poll pdftocairo instead of waiting for it when using the auto temp dir,
+                # its stderr goes to a file so that it can never fill a pipe and block
+                stdout = DEVNULL if auto_temp_dir else PIPE
+                stderr = tempfile.TemporaryFile() if auto_temp_dir else PIPE
+                # Spawn the process and save its uuid
+                processes.append(
+                    (
+                        thread_output_file,
+                        chunk_bytes[next_chunk],
+                        Popen(
+                            args,
+                            env=env,
+                            stdout=stdout,
+                            stderr=stderr,
+                            startupinfo=startupinfo,
+                        ),
+                        stderr,
+                    )
+                )
+                metrics.PROCESS_SPAWNS.inc(command=command)
+                inflight_bytes += chunk_bytes[next_chunk]
+                next_chunk += 1
+
+            uid, estimated_bytes, proc, stderr = processes.popleft()
+            if auto_temp_dir:
+                # Pages are read and deleted as soon as pdftocairo is done writing them
+                _open_frames(
+                    _read_page_files(
+                        proc, output_folder, uid, final_extension, timeout
+                    ),
+                    images,
+                    cumulative_bytes,
+                    retained_budget,
+                    cache,
+                    render_cache_keys,
+                    encoded,
+                    compressed,
+                    auto_grayscale,
+                )
+                stderr.seek(0)
+                data, err = None, stderr.read()
+                stderr.close()
+            else:
+                try:
+                    data, err = proc.communicate(timeout=timeout)
+                except TimeoutExpired:
+                    proc.kill()
+                    outs, errs = proc.communicate()
+                    metrics.TIMEOUTS.inc()
+                    raise PDFPopplerTimeoutError("Run poppler timeout.")
+            inflight_bytes -= estimated_bytes
+
+            if b"Syntax Error" in err:
+                metrics.SYNTAX_ERRORS.inc()
+                if strict:
+                    raise PDFSyntaxError(err.decode("utf8", "ignore"))
+
+            if auto_temp_dir:
+                # The pages were read while pdftocairo was running
+                continue
 
             if output_folder is not None:
-                images += _load_from_output_folder(
+                loaded = _load_from_output_folder(
                     output_folder,
                     uid,
                     final_extension,
                     paths_only,
-                    in_memory=auto_temp_dir,
+                )
+                if metrics.REGISTRY.enabled:
+                    metrics.BYTES_PRODUCED.inc(
+                        sum(
+                            os.path.getsize(im if paths_only else im.filename)
+                            for im in loaded
+                        )
+                    )
+                images += loaded
+            elif (
+                retained_budget is not None
+                or render_cache_keys
+                or encoded
+                or auto_grayscale
+            ):
+                _open_frames(
+                    SPLIT_BUFFER_FUNCS[parsed_fmt](data),
+                    images,
+                    cumulative_bytes,
+                    retained_budget,
+                    cache,
+                    render_cache_keys,
+                    encoded,
+                    compressed,
+                    auto_grayscale,
                 )
             else:
+                metrics.BYTES_PRODUCED.inc(len(data))
                 images += parse_buffer_func(data)
     finally:
         if auto_temp_dir:
             shutil.rmtree(output_folder)
 
+    if page_cache is not None and cache_keys:
+        for i, page in enumerate(pages_to_render):
+            if retained_budget is not None and cumulative_bytes[i] > retained_budget:
+                # Spilled pages stay on disk, caching them would decode them
+                continue
+            images[i].load()
+            page_cache.put(cache_keys[page], images[i], pdf_hash, pdf_path)
+            images[i] = images[i].copy()
+
+    if cached:
+        rendered = iter(images)
+        images = [cached[page] if page in cached else next(rendered) for page in pages]
+
+    if encoded:
+        images = [EncodedPage(page, frame) for page, frame in zip(pages, images)]
+
+    metrics.PAGES_RENDERED.inc(len(images))
+    metrics.RENDER_LATENCY.observe(
+        time.perf_counter() - start_time, fmt=parsed_fmt, dpi=dpi
+    )
+
+    if compressed:
+        return CompressedPages(images)
+
     return images
 
 
 def convert_from_bytes(
     pdf_file: bytes,
-    dpi: int = 200,
+    dpi: Union[int, str] = 200,
     output_folder: Union[str, PurePath] = None,
     first_page: int = None,
     last_page: int = None,
@@ -297,20 +973,36 @@ def convert_from_bytes(
     use_pdftocairo: bool = False,
     timeout: int = None,
     hide_annotations: bool = False,
-) -> List[Image.Image]:
+    max_memory: int = None,
+    max_temp_disk: int = None,
+    cache: RenderCache = None,
+    page_cache: PageCache = None,
+    lazy: bool = False,
+    region: Tuple[int, int, int, int] = None,
+    antialias: bool = None,
+    target_pixels: int = None,
+    max_dimension: int = None,
+    extract_images: bool = False,
+    encoded: bool = False,
+    compressed: bool = False,
+    quality: str = None,
+    auto_grayscale: bool = False,
+    skip_blank: bool = False,
+    max_dpi: int = NATIVE_DPI_LIMIT,
+) -> Union[List[Image.Image], List[EncodedPage], CompressedPages, LazyPages, PageList]:
     """Function wrapping pdftoppm and pdftocairo.
 
     :param pdf_bytes: Bytes of the PDF that you want to convert
     :type pdf_bytes: bytes
-    :param dpi: Image quality in DPI (default 200), defaults to 200
-    :type dpi: int, optional
+    :param dpi: Image quality in DPI (default 200), or "native" to render each page at the resolution of its largest embedded image, defaults to 200
+    :type dpi: Union[int, str], optional
     :param output_folder: Write the resulting images to a folder (instead of directly in memory), defaults to None
     :type output_folder: Union[str, PurePath], optional
     :param first_page: First page to process, defaults to None
     :type first_page: int, optional
     :param last_page: Last page to process before stopping, defaults to None
     :type last_page: int, optional
-    :param fmt: Output image format, defaults to "ppm"
+    :param fmt: Output image format (ppm, jpeg, png, tiff, or pbm for 1-bit black and white pages, also named mono), defaults to "ppm"
     :type fmt: str, optional
     :param jpegopt: jpeg options `quality`, `progressive`, and `optimize` (only for jpeg format), defaults to None
     :type jpegopt: Dict, optional
@@ -344,19 +1036,53 @@ def convert_from_bytes(
     :type timeout: int, optional
     :param hide_annotations: Hide PDF annotations in the output, defaults to False
     :type hide_annotations: bool, optional
-    :raises NotImplementedError: Raised when conflicting parameters are given (hide_annotations for pdftocairo)
+    :param max_memory: Memory budget in bytes, pages are rendered in smaller batches and spilled to temporary files to stay under it, defaults to None
+    :type max_memory: int, optional
+    :param max_temp_disk: Disk budget in bytes of the temporary folder used by pdftocairo when there is no output_folder, /dev/shm is used when it has that much free space, defaults to None
+    :type max_temp_disk: int, optional
+    :param cache: Render cache consulted before spawning poppler and filled with the rendered pages, ignored with output_folder, defaults to None
+    :type cache: RenderCache, optional
+    :param page_cache: In-memory cache of decoded pages consulted before the render cache, ignored with output_folder, defaults to None
+    :type page_cache: PageCache, optional
+    :param lazy: Return LazyPage handles that render on first access instead of rendering every page now, defaults to False
+    :type lazy: bool, optional
+    :param region: Area (x, y, width, height) in pixels to render on each page instead of the whole page, see also render_region, defaults to None
+    :type region: Tuple[int, int, int, int], optional
+    :param antialias: Anti-alias fonts and vector graphics, False is the same as quality="draft", cannot be combined with quality, defaults to None
+    :type antialias: bool, optional
+    :param target_pixels: Pick the dpi of each page so that it has at most this many pixels, replaces dpi, defaults to None
+    :type target_pixels: int, optional
+    :param max_dimension: Pick the dpi of each page so that its longest side has at most this many pixels, replaces dpi, defaults to None
+    :type max_dimension: int, optional
+    :param extract_images: Return the embedded image of pages made of a single full-page JPEG or raw image, as is and at its own resolution, instead of rendering them, ignored with output_folder, size, region and lazy, defaults to False
+    :type extract_images: bool, optional
+    :param encoded: Return the pages as poppler encoded them (EncodedPage), without decoding them with Pillow, ignored with output_folder and lazy, defaults to False
+    :type encoded: bool, optional
+    :param compressed: Return a CompressedPages sequence that keeps the pages compressed in memory and decodes them on access, uncompressed formats are re-encoded as PNG, ignored with output_folder and lazy, defaults to False
+    :type compressed: bool, optional
+    :param quality: Rendering quality preset, "draft" (no anti-aliasing, fastest), "normal" or "high" (anti-aliased thin lines), defaults to None ("normal")
+    :type quality: str, optional
+    :param auto_grayscale: Convert the pages without color to grayscale (mode "L"), the mode of each page tells whether it was, ignored with grayscale, output_folder, encoded and compressed, defaults to False
+    :type auto_grayscale: bool, optional
+    :param skip_blank: Leave out the blank pages, found on a low resolution render of the document, the result is then a PageList (or CompressedPages) telling which pages were skipped, ignored with lazy, defaults to False
+    :type skip_blank: bool, optional
+    :param max_dpi: Highest resolution dpi="native" renders a page at, defaults to 600
+    :type max_dpi: int, optional
+    :raises ValueError: Raised when quality is not one of the presets, or is combined with antialias
+    :raises NotImplementedError: Raised when conflicting parameters are given (hide_annotations or fmt="pbm" for pdftocairo)
     :raises PDFPopplerTimeoutError: Raised after the timeout for the image processing is exceeded
     :raises PDFSyntaxError: Raised if there is a syntax error in the PDF and strict=True
-    :return: A list of Pillow images, one for each page between first_page and last_page
-    :rtype: List[Image.Image]
+    :return: A list of Pillow images, one for each page between first_page and last_page, EncodedPage objects if encoded is True, CompressedPages if compressed is True, LazyPages if lazy is True, PageList if skip_blank is True
+    :rtype: Union[List[Image.Image], List[EncodedPage], CompressedPages, LazyPages, PageList]
     """
 
     fh, temp_filename = tempfile.mkstemp()
+    pages = None
     try:
         with open(temp_filename, "wb") as f:
             f.write(pdf_file)
             f.flush()
-            return convert_from_path(
+            pages = convert_from_path(
                 f.name,
                 dpi=dpi,
                 output_folder=output_folder,
@@ -379,10 +1105,83 @@ def convert_from_bytes(
                 use_pdftocairo=use_pdftocairo,
                 timeout=timeout,
                 hide_annotations=hide_annotations,
+                max_memory=max_memory,
+                max_temp_disk=max_temp_disk,
+                cache=cache,
+                page_cache=page_cache,
+                lazy=lazy,
+                region=region,
+                antialias=antialias,
+                target_pixels=target_pixels,
+                max_dimension=max_dimension,
+                extract_images=extract_images,
+                encoded=encoded,
+                compressed=compressed,
+                quality=quality,
+                auto_grayscale=auto_grayscale,
+                skip_blank=skip_blank,
+                max_dpi=max_dpi,
             )
+        if lazy:
+            # The pages render from the temporary file, they delete it once closed
+            pages.temp_path = temp_filename
+        return pages
     finally:
         os.close(fh)
-        os.remove(temp_filename)
+        if not lazy or pages is None:
+            os.remove(temp_filename)
+
+
+def render_region(
+    pdf: Union[str, PurePath, bytes],
+    page: int,
+    bbox: Tuple[float, float, float, float],
+    dpi: int = 200,
+    units: str = "pt",
+    **kwargs,
+) -> Image.Image:
+    """Render only a rectangle of a page, the rest of the page is neither rasterized nor transferred
+
+    :param pdf: Path to the PDF, or its bytes
+    :type pdf: Union[str, PurePath, bytes]
+    :param page: Page to render, starting at 1
+    :type page: int
+    :param bbox: Rectangle (x0, y0, x1, y1) measured from the top left corner of the page
+    :type bbox: Tuple[float, float, float, float]
+    :param dpi: Image quality in DPI, defaults to 200
+    :type dpi: int, optional
+    :param units: Units of bbox, "pt" for PDF points (1/72 inch) or "px" for pixels at the given dpi, defaults to "pt"
+    :type units: str, optional
+    :param kwargs: Other parameters of convert_from_path (fmt, grayscale, use_cropbox, ...), except size
+    :raises ValueError: Raised when the units are unknown or the rectangle is empty
+    :return: The rendered rectangle
+    :rtype: Image.Image
+    """
+
+    x0, y0, x1, y1 = bbox
+    if x1 <= x0 or y1 <= y0:
+        raise ValueError(f"Rectangle {bbox} is empty")
+
+    if units == "pt":
+        x, y = math.floor(x0 * dpi / 72), math.floor(y0 * dpi / 72)
+        width = math.ceil(x1 * dpi / 72) - x
+        height = math.ceil(y1 * dpi / 72) - y
+    elif units == "px":
+        x, y = int(x0), int(y0)
+        width, height = int(x1) - x, int(y1) - y
+    else:
+        raise ValueError(f"Units {units} are not pt or px")
+
+    convert = convert_from_bytes if isinstance(pdf, bytes) else convert_from_path
+    images = convert(
+        pdf,
+        dpi=dpi,
+        first_page=page,
+        last_page=page,
+        region=(x, y, width, height),
+        **kwargs,
+    )
+    return images[0]
 
 
 def _build_command(
@@ -401,6 +1200,7 @@ def _build_command(
     grayscale: bool,
     size: Union[int, Tuple[int, int]],
     hide_annotations: bool,
+    region: Tuple[int, int, int, int] = None,
 ) -> List[str]:
     if use_cropbox:
         args.append("-cropbox")
@@ -411,13 +1211,20 @@ def _build_command(
     if transparent and fmt in TRANSPARENT_FILE_TYPES:
         args.append("-transp")
 
+    if region is not None:
+        x, y, width, height = region
+        args.extend(["-x", str(int(x)), "-y", str(int(y))])
+        args.extend(["-W", str(int(width)), "-H", str(int(height))])
+
     if first_page is not None:
         args.extend(["-f", str(first_page)])
 
     if last_page is not None:
         args.extend(["-l", str(last_page)])
 
-    if fmt not in ["pgm", "ppm"]:
+    if fmt == "pbm":
+        args.append("-mono")
+    elif fmt not in ["pgm", "ppm"]:
         args.append("-" + fmt)
 
     if fmt in ["jpeg", "jpg"] and jpegopt:
@@ -435,7 +1242,7 @@ def _build_command(
     if ownerpw is not None:
         args.extend(["-opw", ownerpw])
 
-    if grayscale:
+    if grayscale and fmt != "pbm":
         args.append("-gray")
 
     if size is None:
@@ -469,6 +1276,8 @@ def _parse_format(fmt: str, grayscale: bool = False) -> Tuple[str, str, Callable
         return "png", "png", parse_buffer_to_png, False
     if fmt in ("tif", "tiff"):
         return "tiff", "tif", None, True
+    if fmt in ("pbm", "mono"):
+        return "pbm", "pbm", parse_buffer_to_pbm, False
     if fmt == "ppm" and grayscale:
         return "pgm", "pgm", parse_buffer_to_pgm, False
     # Unable to parse the format so we'll use the default
@@ -498,6 +1307,15 @@ def _get_command_path(command: str, poppler_path: str = None) -> str:
 
 def _get_poppler_version(
     command: str, poppler_path: str = None, timeout: int = None
+) -> Tuple[int, int]:
+    key = (command, poppler_path)
+    if key not in _poppler_versions:
+        _poppler_versions[key] = _query_poppler_version(command, poppler_path, timeout)
+    return _poppler_versions[key]
+
+
+def _query_poppler_version(
+    command: str, poppler_path: str = None, timeout: int = None
 ) -> Tuple[int, int]:
     command = [_get_command_path(command, poppler_path), "-v"]
 
@@ -505,12 +1323,16 @@ def _get_poppler_version(
     if poppler_path is not None:
         env["LD_LIBRARY_PATH"] = poppler_path + ":" + env.get("LD_LIBRARY_PATH", "")
     proc = Popen(command, env=env, stdout=PIPE, stderr=PIPE)
+    metrics.PROCESS_SPAWNS.inc(
+        command=os.path.splitext(os.path.basename(command[0]))[0]
+    )
 
     try:
         data, err = proc.communicate(timeout=timeout)
     except TimeoutExpired:
         proc.kill()
         outs, errs = proc.communicate()
+        metrics.TIMEOUTS.inc()
         raise PDFPopplerTimeoutError("Run poppler poppler timeout.")
 
     try:
@@ -531,6 +1353,7 @@ def pdfinfo_from_path(
     timeout: int = None,
     first_page: int = None,
     last_page: int = None,
+    box: bool = False,
 ) -> Dict:
     """Function wrapping poppler's pdfinfo utility and returns the result as a dictionary.
 
@@ -550,6 +1373,8 @@ def pdfinfo_from_path(
     :type first_page: int, optional
     :param last_page: Last page to process before stopping, defaults to None
     :type last_page: int, optional
+    :param box: Also report the media, crop, bleed, trim and art boxes of each page, defaults to False
+    :type box: bool, optional
     :raises PDFPopplerTimeoutError: Raised after the timeout for the image processing is exceeded
     :raises PDFInfoNotInstalledError: Raised if pdfinfo is not installed
     :raises PDFPageCountError: Raised if the output could not be parsed
@@ -574,17 +1399,22 @@ def pdfinfo_from_path(
         if last_page:
             command.extend(["-l", str(last_page)])
 
+        if box:
+            command.append("-box")
+
         # Add poppler path to LD_LIBRARY_PATH
         env = os.environ.copy()
         if poppler_path is not None:
             env["LD_LIBRARY_PATH"] = poppler_path + ":" + env.get("LD_LIBRARY_PATH", "")
         proc = Popen(command, env=env, stdout=PIPE, stderr=PIPE)
+        metrics.PROCESS_SPAWNS.inc(command="pdfinfo")
 
         try:
             out, err = proc.communicate(timeout=timeout)
         except TimeoutExpired:
             proc.kill()
             outs, errs = proc.communicate()
+            metrics.TIMEOUTS.inc()
             raise PDFPopplerTimeoutError("Run poppler poppler timeout.")
 
         d = {}
@@ -622,6 +1452,7 @@ def pdfinfo_from_bytes(
     timeout: int = None,
     first_page: int = None,
     last_page: int = None,
+    box: bool = False,
 ) -> Dict:
     """Function wrapping poppler's pdfinfo utility and returns the result as a dictionary.
 
@@ -641,6 +1472,8 @@ def pdfinfo_from_bytes(
     :type first_page: int, optional
     :param last_page: Last page to process before stopping, defaults to None
     :type last_page: int, optional
+    :param box: Also report the media, crop, bleed, trim and art boxes of each page, defaults to False
+    :type box: bool, optional
     :return: Dictionary containing various information on the PDF
     :rtype: Dict
     """
@@ -658,18 +1491,106 @@ def pdfinfo_from_bytes(
             timeout=timeout,
             first_page=first_page,
             last_page=last_page,
+            box=box,
         )
     finally:
         os.close(fh)
         os.remove(temp_filename)
 
 
+def page_geometry_from_path(
+    pdf_path: Union[str, PurePath],
+    first_page: int = None,
+    last_page: int = None,
+    userpw: str = None,
+    ownerpw: str = None,
+    poppler_path: str = None,
+    timeout: int = None,
+) -> PageGeometry:
+    """Index of the sizes, rotations and boxes of the pages, from a single pdfinfo call
+
+    :param pdf_path: Path to the PDF
+    :type pdf_path: Union[str, PurePath]
+    :param first_page: First page to index, defaults to None
+    :type first_page: int, optional
+    :param last_page: Last page to index, defaults to None
+    :type last_page: int, optional
+    :param userpw: PDF's password, defaults to None
+    :type userpw: str, optional
+    :param ownerpw: PDF's owner password, defaults to None
+    :type ownerpw: str, optional
+    :param poppler_path: Path to look for poppler binaries, defaults to None
+    :type poppler_path: Union[str, PurePath], optional
+    :param timeout: Raise PDFPopplerTimeoutError after the given time, defaults to None
+    :type timeout: int, optional
+    :return: Geometry of the pages between first_page and last_page
+    :rtype: PageGeometry
+    """
+    if isinstance(pdf_path, PurePath):
+        pdf_path = pdf_path.as_posix()
+    if first_page is None or first_page < 1:
+        first_page = 1
+    info = pdfinfo_from_path(
+        pdf_path,
+        userpw,
+        ownerpw,
+        poppler_path=poppler_path,
+        timeout=timeout,
+        first_page=first_page,
+        # pdfinfo stops at the last page of the document
+        last_page=last_page or 2**31 - 1,
+        box=True,
+    )
+    if last_page is None or last_page > info["Pages"]:
+        last_page = info["Pages"]
+    return PageGeometry.from_pdfinfo(info, first_page, last_page)
+
+
+def page_geometry_from_bytes(
+    pdf_file: bytes,
+    first_page: int = None,
+    last_page: int = None,
+    userpw: str = None,
+    ownerpw: str = None,
+    poppler_path: str = None,
+    timeout: int = None,
+) -> PageGeometry:
+    """Index of the sizes, rotations and boxes of the pages, from a single pdfinfo call
+
+    :param pdf_file: Bytes of the PDF
+    :type pdf_file: bytes
+    :param first_page: First page to index, defaults to None
+    :type first_page: int, optional
+    :param last_page: Last page to index, defaults to None
+    :type last_page: int, optional
+    :param userpw: PDF's password, defaults to None
+    :type userpw: str, optional
+    :param ownerpw: PDF's owner password, defaults to None
+    :type ownerpw: str, optional
+    :param poppler_path: Path to look for poppler binaries, defaults to None
+    :type poppler_path: Union[str, PurePath], optional
+    :param timeout: Raise PDFPopplerTimeoutError after the given time, defaults to None
+    :type timeout: int, optional
+    :return: Geometry of the pages between first_page and last_page
+    :rtype: PageGeometry
+    """
+    with _document_path(pdf_file) as pdf_path:
+        return page_geometry_from_path(
+            pdf_path,
+            first_page=first_page,
+            last_page=last_page,
+            userpw=userpw,
+            ownerpw=ownerpw,
+            poppler_path=poppler_path,
+            timeout=timeout,
+        )
+
+
 def _load_from_output_folder(
     output_folder: str,
     output_file: str,
     ext: str,
     paths_only: bool,
-    in_memory: bool = False,
 ) -> List[Image.Image]:
     images = []
     for f in sorted(os.listdir(output_folder)):
@@ -678,6 +1599,457 @@ def _load_from_output_folder(
                 images.append(os.path.join(output_folder, f))
             else:
                 images.append(Image.open(os.path.join(output_folder, f)))
-                if in_memory:
-                    images[-1].load()
     return images
+
+
+def _page_runs(pages: List[int]) -> List[Tuple[int, int]]:
+    """Group sorted page numbers into (first, last) runs of consecutive pages"""
+    runs = []
+    for page in pages:
+        if runs and runs[-1][1] == page - 1:
+            runs[-1] = (runs[-1][0], page)
+        else:
+            runs.append((page, page))
+    return runs
+
+
+def _split_pages(
+    first_page: int, last_page: int, thread_count: int
+) -> List[Tuple[int, int]]:
+    page_count = last_page - first_page + 1
+    reminder = page_count % thread_count
+    current_page = first_page
+    chunks = []
+    for _ in range(thread_count):
+        # Get the number of pages the thread will be processing
+        thread_page_count = page_count // thread_count + int(reminder > 0)
+        chunks.append((current_page, current_page + thread_page_count - 1))
+        # Update page values
+        current_page = current_page + thread_page_count
+        reminder -= int(reminder > 0)
+    return chunks
+
+
+def _split_pages_by_budget(
+    first_page: int, page_bytes: List[int], budget: int
+) -> List[Tuple[int, int]]:
+    chunks = []
+    chunk_first_page = first_page
+    chunk_bytes = 0
+    for i, estimated_bytes in enumerate(page_bytes):
+        page = first_page + i
+        if page > chunk_first_page and chunk_bytes + estimated_bytes > budget:
+            chunks.append((chunk_first_page, page - 1))
+            chunk_first_page = page
+            chunk_bytes = 0
+        chunk_bytes += estimated_bytes
+    chunks.append((chunk_first_page, first_page + len(page_bytes) - 1))
+    return chunks
+
+
+def _estimate_page_bytes(
+    width: float,
+    height: float,
+    dpi: int,
+    size: Union[Tuple, int],
+    channels: int,
+) -> int:
+    """Decoded size of a page given its dimensions in points"""
+    width, height = _page_pixel_size(width, height, dpi, size)
+    return width * height * channels
+
+
+def _auto_dpi(
+    width: float,
+    height: float,
+    target_pixels: int = None,
+    max_dimension: int = None,
+) -> int:
+    """Highest integer dpi rendering a page of width x height points within the pixel budgets"""
+    dpis = []
+    if target_pixels is not None:
+        dpis.append(72 * math.sqrt(target_pixels / (width * height)))
+    if max_dimension is not None:
+        dpis.append(72 * max_dimension / max(width, height))
+    dpi = max(math.floor(min(dpis)), 1)
+    # Poppler rounds the sides up, which may cross the budget by a few pixels
+    while dpi > 1:
+        page_width, page_height = _page_pixel_size(width, height, dpi, None)
+        if (target_pixels is None or page_width * page_height <= target_pixels) and (
+            max_dimension is None or max(page_width, page_height) <= max_dimension
+        ):
+            break
+        dpi -= 1
+    return dpi
+
+
+def _page_pixel_size(
+    width: float,
+    height: float,
+    dpi: int,
+    size: Union[Tuple, int],
+) -> Tuple[int, int]:
+    """Size in pixels of a page given its dimensions in points, as poppler rounds it"""
+    width, height = width * dpi / 72, height * dpi / 72
+    if isinstance(size, tuple) and len(size) == 2:
+        if size[0] is not None and size[1] is not None:
+            width, height = size
+        elif size[0] is not None:
+            width, height = size[0], height * size[0] / width
+        elif size[1] is not None:
+            width, height = width * size[1] / height, size[1]
+    elif size is not None:
+        # -scale-to fits the longest side
+        scale_to = size[0] if isinstance(size, tuple) else size
+        ratio = scale_to / max(width, height)
+        width, height = width * ratio, height * ratio
+    return math.ceil(width), math.ceil(height)
+
+
+def _pdfinfo_page_sizes(
+    pdf_path: str,
+    first_page: int,
+    last_page: int,
+    userpw: str = None,
+    ownerpw: str = None,
+    poppler_path: str = None,
+    use_cropbox: bool = False,
+) -> List[Tuple[float, float]]:
+    """Size in points of the pages as poppler renders them, rotated and from the right box"""
+    geometry = page_geometry_from_path(
+        pdf_path, first_page, last_page, userpw, ownerpw, poppler_path
+    )
+    return geometry.sizes("CropBox" if use_cropbox else "MediaBox")
+
+
+def _pdfimages_list(
+    pdf_path: str,
+    first_page: int,
+    last_page: int,
+    userpw: str = None,
+    ownerpw: str = None,
+    poppler_path: str = None,
+    timeout: int = None,
+) -> List[Dict]:
+    """Images drawn on the pages, parsed from pdfimages -list"""
+    command = [_get_command_path("pdfimages", poppler_path), "-list"]
+    command.extend(["-f", str(first_page), "-l", str(last_page)])
+    if userpw is not None:
+        command.extend(["-upw", userpw])
+    if ownerpw is not None:
+        command.extend(["-opw", ownerpw])
+    out = _run_pdfimages(command + [pdf_path], poppler_path, timeout)
+
+    images = []
+    # page num type width height color comp bpc enc interp object ID x-ppi y-ppi size ratio
+    for line in out.decode("utf8", "ignore").splitlines()[2:]:
+        fields = line.split()
+        if len(fields) < 14:
+            continue
+        try:
+            x_ppi, y_ppi = float(fields[12]), float(fields[13])
+        except ValueError:
+            x_ppi = y_ppi = 0.0
+        images.append(
+            {
+                "page": int(fields[0]),
+                "type": fields[2],
+                "width": int(fields[3]),
+                "height": int(fields[4]),
+                "color": fields[5],
+                "comp": int(fields[6]),
+                "enc": fields[8],
+                "x_ppi": x_ppi,
+                "y_ppi": y_ppi,
+            }
+        )
+    return images
+
+
+def _native_dpis(
+    pdf_path: str,
+    first_page: int,
+    page_sizes: List[Tuple[float, float]],
+    userpw: str = None,
+    ownerpw: str = None,
+    poppler_path: str = None,
+    timeout: int = None,
+    max_dpi: int = NATIVE_DPI_LIMIT,
+) -> List[int]:
+    """Resolution of the image covering most of each page, NATIVE_DPI_DEFAULT for other pages"""
+    last_page = first_page + len(page_sizes) - 1
+    try:
+        images = _pdfimages_list(
+            pdf_path, first_page, last_page, userpw, ownerpw, poppler_path, timeout
+        )
+    except OSError:
+        images = []
+    largest = {}
+    for image in images:
+        if image["type"] != "image" or image["x_ppi"] <= 0 or image["y_ppi"] <= 0:
+            continue
+        # Small images, such as logos, do not say anything about the page
+        width, height = page_sizes[image["page"] - first_page]
+        drawn_area = (image["width"] * 72 / image["x_ppi"]) * (
+            image["height"] * 72 / image["y_ppi"]
+        )
+        if drawn_area < NATIVE_DPI_MIN_COVERAGE * width * height:
+            continue
+        if drawn_area > largest.get(image["page"], (0, 0))[0]:
+            largest[image["page"]] = (drawn_area, max(image["x_ppi"], image["y_ppi"]))
+    return [
+        min(max(round(largest[page][1]), 1), max_dpi)
+        if page in largest
+        else min(NATIVE_DPI_DEFAULT, max_dpi)
+        for page in range(first_page, last_page + 1)
+    ]
+
+
+def _extract_full_page_images(
+    pdf_path: str,
+    geometry: PageGeometry,
+    box: str = "MediaBox",
+    userpw: str = None,
+    ownerpw: str = None,
+    poppler_path: str = None,
+    timeout: int = None,
+) -> Dict[int, bytes]:
+    """Original image streams of the pages made of a single image covering the whole page"""
+    try:
+        images = _pdfimages_list(
+            pdf_path,
+            geometry.first_page,
+            geometry.pages[-1],
+            userpw,
+            ownerpw,
+            poppler_path,
+            timeout,
+        )
+    except OSError:
+        # pdfimages is missing, every page gets rendered
+        return {}
+
+    images_by_page = {}
+    for image in images:
+        images_by_page.setdefault(image["page"], []).append(image)
+
+    pages = []
+    for page, page_images in images_by_page.items():
+        if len(page_images) != 1 or geometry.rotation(page) != 0:
+            continue
+        image = page_images[0]
+        if image["type"] != "image" or image["enc"] not in EXTRACTABLE_ENCODINGS:
+            continue
+        if image["color"] not in EXTRACTABLE_COLORS or image["comp"] not in (1, 3):
+            continue
+        if image["x_ppi"] <= 0 or image["y_ppi"] <= 0:
+            continue
+        # The image is drawn over the whole page, give or take rounding of the ppi
+        width, height = geometry.size(page, box, rotated=False)
+        drawn_width = image["width"] * 72 / image["x_ppi"]
+        drawn_height = image["height"] * 72 / image["y_ppi"]
+        if (
+            abs(drawn_width - width) <= FULL_PAGE_TOLERANCE * width
+            and abs(drawn_height - height) <= FULL_PAGE_TOLERANCE * height
+        ):
+            pages.append(page)
+
+    frames = {}
+    output_folder = tempfile.mkdtemp()
+    try:
+        for run_first_page, run_last_page in _page_runs(sorted(pages)):
+            command = [_get_command_path("pdfimages", poppler_path), "-all", "-p"]
+            command.extend(["-f", str(run_first_page), "-l", str(run_last_page)])
+            if userpw is not None:
+                command.extend(["-upw", userpw])
+            if ownerpw is not None:
+                command.extend(["-opw", ownerpw])
+            command.extend([pdf_path, os.path.join(output_folder, "img")])
+            _run_pdfimages(command, poppler_path, timeout)
+        # Files are named img-<page>-<image number>.<ext>
+        for filename in os.listdir(output_folder):
+            page = int(filename.split("-")[1])
+            with open(os.path.join(output_folder, filename), "rb") as f:
+                frames[page] = f.read()
+    except OSError:
+        return {}
+    finally:
+        shutil.rmtree(output_folder, ignore_errors=True)
+    return frames
+
+
+def _run_pdfimages(
+    command: List[str], poppler_path: str = None, timeout: int = None
+) -> bytes:
+    env = os.environ.copy()
+    if poppler_path is not None:
+        env["LD_LIBRARY_PATH"] = poppler_path + ":" + env.get("LD_LIBRARY_PATH", "")
+    proc = Popen(command, env=env, stdout=PIPE, stderr=PIPE)
+    metrics.PROCESS_SPAWNS.inc(command="pdfimages")
+    try:
+        out, _ = proc.communicate(timeout=timeout)
+    except TimeoutExpired:
+        proc.kill()
+        proc.communicate()
+        metrics.TIMEOUTS.inc()
+        raise PDFPopplerTimeoutError("Run poppler timeout.")
+    return out
+
+
+def _open_frame(
+    frame: bytes, spill: bool = False, auto_grayscale: bool = False
+) -> Image.Image:
+    if auto_grayscale:
+        image = _compact_grayscale(Image.open(BytesIO(frame)))
+        if not spill:
+            return image
+        if image.mode == "L":
+            # Spill the compacted page, the decoded one is dropped
+            output = BytesIO()
+            image.save(output, "PPM")
+            frame = output.getvalue()
+    if not spill:
+        return Image.open(BytesIO(frame))
+    # The file has no name and is deleted once the image is garbage collected
+    fh = tempfile.TemporaryFile()
+    fh.write(frame)
+    fh.seek(0)
+    return Image.open(fh)
+
+
+def _open_frames(
+    frames: Iterator[bytes],
+    images: List[Image.Image],
+    cumulative_bytes: List[int] = None,
+    retained_budget: int = None,
+    cache: RenderCache = None,
+    cache_keys: List[str] = None,
+    encoded: bool = False,
+    compressed: bool = False,
+    auto_grayscale: bool = False,
+):
+    for frame in frames:
+        metrics.BYTES_PRODUCED.inc(len(frame))
+        if cache_keys is not None:
+            cache.put(cache_keys[len(images)], frame)
+        if encoded:
+            # Compressing each page as it arrives bounds the uncompressed data held
+            images.append(compress_frame(frame) if compressed else frame)
+            continue
+        # Once the pages kept so far exceed the budget, the others are spilled
+        spill = (
+            retained_budget is not None
+            and cumulative_bytes[len(images)] > retained_budget
+        )
+        images.append(_open_frame(frame, spill=spill, auto_grayscale=auto_grayscale))
+
+
+def _blank_pages(
+    pdf_path: str,
+    first_page: int,
+    last_page: int,
+    thread_count: int,
+    userpw: str,
+    ownerpw: str,
+    use_cropbox: bool,
+    poppler_path: str,
+    timeout: int,
+    hide_annotations: bool,
+    page_count: int = None,
+    poppler_version: Tuple[int, int] = None,
+) -> List[int]:
+    """Pages found blank on a grayscale render at BLANK_PROBE_DPI"""
+    probes = _convert_from_path(
+        pdf_path,
+        dpi=BLANK_PROBE_DPI,
+        first_page=first_page,
+        last_page=last_page,
+        thread_count=thread_count,
+        userpw=userpw,
+        ownerpw=ownerpw,
+        use_cropbox=use_cropbox,
+        poppler_path=poppler_path,
+        grayscale=True,
+        timeout=timeout,
+        hide_annotations=hide_annotations,
+        # Without anti-aliasing thin strokes stay dark, they are not mistaken for paper
+        quality="draft",
+        page_count=page_count,
+        poppler_version=poppler_version,
+    )
+    blank_pages = [
+        page for page, probe in enumerate(probes, first_page) if is_blank(probe)
+    ]
+    metrics.PAGES_SKIPPED_BLANK.inc(len(blank_pages))
+    return blank_pages
+
+
+def _compact_grayscale(image: Image.Image) -> Image.Image:
+    """The page in mode L if it has no color, checking it decodes it"""
+    if not is_grayscale(image):
+        return image
+    metrics.PAGES_COMPACTED.inc()
+    return image.convert("L")
+
+
+def _read_page_files(
+    proc: Popen,
+    output_folder: str,
+    output_file: str,
+    ext: str,
+    timeout: int = None,
+) -> Iterator[bytes]:
+    """Yield the content of each page file of a running process, then delete the file
+
+    pdftoppm and pdftocairo write one page after the other, so every file but the most
+    recent one is complete while the process is running.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    delay = 0.001
+    while True:
+        done = proc.poll() is not None
+        paths = _load_from_output_folder(output_folder, output_file, ext, True)
+        for path in paths if done else paths[:-1]:
+            with open(path, "rb") as f:
+                frame = f.read()
+            os.remove(path)
+            delay = 0.001
+            yield frame
+        if done:
+            return
+        if deadline is not None and time.monotonic() > deadline:
+            proc.kill()
+            proc.communicate()
+            metrics.TIMEOUTS.inc()
+            raise PDFPopplerTimeoutError("Run poppler timeout.")
+        time.sleep(delay)
+        delay = min(delay * 2, 0.05)
+
+
+def _make_auto_temp_dir(required_bytes: int = None) -> str:
+    """Create the temporary output folder, on tmpfs if it has room for required_bytes"""
+    if required_bytes is not None and os.path.isdir(TMPFS_DIR):
+        try:
+            stat = os.statvfs(TMPFS_DIR)
+            if stat.f_bavail * stat.f_frsize >= required_bytes:
+                return tempfile.mkdtemp(dir=TMPFS_DIR)
+        except OSError:
+            pass
+    return tempfile.mkdtemp()
+
+
+@contextmanager
+def _document_path(pdf: Union[str, PurePath, bytes]) -> Iterator[str]:
+    """Path of the document, written to a temporary file if given as bytes"""
+    if isinstance(pdf, PurePath):
+        pdf = pdf.as_posix()
+    if not isinstance(pdf, bytes):
+        yield pdf
+        return
+    fh, temp_path = tempfile.mkstemp()
+    try:
+        with os.fdopen(fh, "wb") as f:
+            f.write(pdf)
+        yield temp_path
+    finally:
+        os.remove(temp_path)
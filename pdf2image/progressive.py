@@ -0,0 +1,105 @@
+"""
+    pdf2image progressive delivery, a fast preview of each page then the full render
+"""
+
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import PurePath
+from typing import Iterator, Tuple, Union
+
+from PIL import Image
+
+from pdf2image.pdf2image import _document_path, convert_from_path, pdfinfo_from_path
+
+PREVIEW = "preview"
+FULL = "full"
+
+
+def iter_progressive(
+    pdf: Union[str, PurePath, bytes],
+    first_page: int = None,
+    last_page: int = None,
+    dpi: int = 200,
+    preview_dpi: int = 50,
+    preview_quality: str = "draft",
+    thread_count: int = 1,
+    preview_thread_count: int = 1,
+    **kwargs,
+) -> Iterator[Tuple[int, str, Image.Image]]:
+    """Yield a low resolution preview of each page as soon as possible, then its full render
+
+    The two tiers run at the same time on separate pools, so the full renders never
+    delay the previews. Pages are yielded as they are done: a preview is skipped when
+    the full render of that page was yielded first. Closing the iterator cancels the
+    renders that have not started.
+
+    :param pdf: Path to the PDF, or its bytes
+    :type pdf: Union[str, PurePath, bytes]
+    :param first_page: First page to process, defaults to None
+    :type first_page: int, optional
+    :param last_page: Last page to process before stopping, defaults to None
+    :type last_page: int, optional
+    :param dpi: Resolution of the full renders, defaults to 200
+    :type dpi: int, optional
+    :param preview_dpi: Resolution of the previews, defaults to 50
+    :type preview_dpi: int, optional
+    :param preview_quality: Rendering quality preset of the previews, see convert_from_path, defaults to "draft"
+    :type preview_quality: str, optional
+    :param thread_count: How many poppler processes render full pages at the same time, defaults to 1
+    :type thread_count: int, optional
+    :param preview_thread_count: How many poppler processes render previews at the same time, defaults to 1
+    :type preview_thread_count: int, optional
+    :param kwargs: Other parameters of convert_from_path (fmt, grayscale, userpw, ...), except size
+    :return: Iterator of (page number, PREVIEW or FULL, image)
+    :rtype: Iterator[Tuple[int, str, Image.Image]]
+    """
+    with _document_path(pdf) as pdf_path:
+        page_count = pdfinfo_from_path(
+            pdf_path,
+            kwargs.get("userpw"),
+            kwargs.get("ownerpw"),
+            poppler_path=kwargs.get("poppler_path"),
+        )["Pages"]
+        if first_page is None or first_page < 1:
+            first_page = 1
+        if last_page is None or last_page > page_count:
+            last_page = page_count
+        pages = range(first_page, last_page + 1)
+
+        results = queue.Queue()
+
+        def render(page, quality):
+            try:
+                if quality == PREVIEW:
+                    options = dict(
+                        kwargs, dpi=preview_dpi, quality=preview_quality, antialias=None
+                    )
+                else:
+                    options = dict(kwargs, dpi=dpi)
+                image = convert_from_path(
+                    pdf_path, first_page=page, last_page=page, **options
+                )[0]
+                results.put((page, quality, image, None))
+            except BaseException as e:
+                results.put((page, quality, None, e))
+
+        preview_pool = ThreadPoolExecutor(max(preview_thread_count, 1))
+        full_pool = ThreadPoolExecutor(max(thread_count, 1))
+        futures = [preview_pool.submit(render, page, PREVIEW) for page in pages]
+        futures += [full_pool.submit(render, page, FULL) for page in pages]
+        try:
+            full_pages = set()
+            for _ in futures:
+                page, quality, image, error = results.get()
+                if error is not None:
+                    raise error
+                if quality == PREVIEW and page in full_pages:
+                    continue
+                if quality == FULL:
+                    full_pages.add(page)
+                yield page, quality, image
+        finally:
+            for future in futures:
+                future.cancel()
+            preview_pool.shutdown()
+            full_pool.shutdown()
@@ -0,0 +1,82 @@
+"""
+    pdf2image multi-resolution rendering from a single poppler pass
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import PurePath
+from typing import Dict, List, Sequence, Union
+
+from PIL import Image
+
+from pdf2image.pdf2image import convert_from_bytes, convert_from_path
+
+
+def downsample_levels(
+    image: Image.Image,
+    dpi: int,
+    dpis: Sequence[int],
+    resample: int = Image.LANCZOS,
+) -> Dict[int, Image.Image]:
+    """Derive the smaller levels of a page rendered at dpi, each from the next larger one
+
+    :param image: Page rendered at dpi
+    :type image: Image.Image
+    :param dpi: Resolution of image
+    :type dpi: int
+    :param dpis: Resolutions to return, none of them above dpi
+    :type dpis: Sequence[int]
+    :param resample: Pillow resampling filter, defaults to Image.LANCZOS
+    :type resample: int, optional
+    :return: Dictionary mapping each resolution to its image
+    :rtype: Dict[int, Image.Image]
+    """
+    levels = {dpi: image}
+    source = image
+    for level_dpi in sorted(set(dpis), reverse=True):
+        if level_dpi >= dpi:
+            continue
+        size = (
+            max(1, round(image.width * level_dpi / dpi)),
+            max(1, round(image.height * level_dpi / dpi)),
+        )
+        # reducing_gap first shrinks by an integer factor with a box filter, much faster
+        source = source.resize(size, resample=resample, reducing_gap=3.0)
+        levels[level_dpi] = source
+    return {level_dpi: levels[level_dpi] for level_dpi in dpis}
+
+
+def render_pyramid(
+    pdf: Union[str, PurePath, bytes],
+    dpis: Sequence[int] = (72, 150, 300),
+    thread_count: int = 1,
+    resample: int = Image.LANCZOS,
+    **kwargs,
+) -> List[Dict[int, Image.Image]]:
+    """Render the pages once at the highest resolution and derive the others by downsampling
+
+    Pillow releases the GIL while resizing, so the pages are downsampled in parallel by a
+    pool of thread_count threads.
+
+    :param pdf: Path to the PDF, or its bytes
+    :type pdf: Union[str, PurePath, bytes]
+    :param dpis: Resolutions to return for each page, defaults to (72, 150, 300)
+    :type dpis: Sequence[int], optional
+    :param thread_count: How many threads render and downsample, defaults to 1
+    :type thread_count: int, optional
+    :param resample: Pillow resampling filter, defaults to Image.LANCZOS
+    :type resample: int, optional
+    :param kwargs: Other parameters of convert_from_path (first_page, fmt, grayscale, ...), except dpi, size and paths_only
+    :return: For each page, a dictionary mapping each resolution to its image
+    :rtype: List[Dict[int, Image.Image]]
+    """
+    if not dpis:
+        raise ValueError("At least one dpi is required")
+    max_dpi = max(dpis)
+    convert = convert_from_bytes if isinstance(pdf, bytes) else convert_from_path
+    images = convert(pdf, dpi=max_dpi, thread_count=thread_count, **kwargs)
+    with ThreadPoolExecutor(max(thread_count, 1)) as executor:
+        return list(
+            executor.map(
+                lambda image: downsample_levels(image, max_dpi, dpis, resample), images
+            )
+        )
@@ -0,0 +1,160 @@
+"""
+    pdf2image document session with speculative prefetch of neighboring pages
+"""
+
+import os
+import platform
+import threading
+from collections import deque
+from pathlib import PurePath
+from typing import Union
+
+from PIL import Image
+
+from pdf2image.cache import PageCache
+from pdf2image.pdf2image import convert_from_path, pdfinfo_from_path
+
+# Added to the niceness of the prefetch thread and of the poppler processes it spawns
+PREFETCH_NICENESS = 10
+
+
+class DocumentSession(object):
+    """Renders pages of one document on demand and prefetches their neighbors
+
+    After each page() call, the following prefetch_ahead and preceding prefetch_behind
+    pages are rendered by a background thread into the page cache, so that the next
+    request is served without waiting for poppler. A new page() call cancels the
+    prefetch work that has not started yet; if the requested page is being
+    prefetched, the call waits for it instead of rendering it twice. On Linux the
+    prefetch thread and its poppler processes run at a lower priority.
+
+    :param pdf_path: Path to the PDF
+    :type pdf_path: Union[str, PurePath]
+    :param page_cache: Cache holding the rendered pages, defaults to a new PageCache()
+    :type page_cache: PageCache, optional
+    :param prefetch_ahead: Number of following pages to prefetch, defaults to 1
+    :type prefetch_ahead: int, optional
+    :param prefetch_behind: Number of preceding pages to prefetch, defaults to 0
+    :type prefetch_behind: int, optional
+    :param kwargs: Other parameters of convert_from_path (dpi, fmt, size, ...)
+    """
+
+    def __init__(
+        self,
+        pdf_path: Union[str, PurePath],
+        page_cache: PageCache = None,
+        prefetch_ahead: int = 1,
+        prefetch_behind: int = 0,
+        **kwargs,
+    ):
+        if isinstance(pdf_path, PurePath):
+            pdf_path = pdf_path.as_posix()
+        self.pdf_path = pdf_path
+        self.page_cache = page_cache if page_cache is not None else PageCache()
+        self.prefetch_ahead = prefetch_ahead
+        self.prefetch_behind = prefetch_behind
+        self.kwargs = kwargs
+        self.page_count = pdfinfo_from_path(
+            pdf_path,
+            kwargs.get("userpw"),
+            kwargs.get("ownerpw"),
+            poppler_path=kwargs.get("poppler_path"),
+        )["Pages"]
+        self.condition = threading.Condition()
+        self.queue = deque()
+        self.inflight = None
+        self.worker = None
+        self.closed = False
+        self.prefetched = 0
+        self.cancelled = 0
+
+    def _render(self, page_number: int) -> Image.Image:
+        return convert_from_path(
+            self.pdf_path,
+            first_page=page_number,
+            last_page=page_number,
+            page_cache=self.page_cache,
+            **self.kwargs,
+        )[0]
+
+    def page(self, page_number: int) -> Image.Image:
+        """Returns the rendered page, then starts prefetching its neighbors
+
+        :param page_number: Page number, starting at 1
+        :type page_number: int
+        :raises IndexError: Raised when the page is not in the document
+        """
+        if not 1 <= page_number <= self.page_count:
+            raise IndexError(f"Page {page_number} is not in 1..{self.page_count}")
+        with self.condition:
+            self.cancelled += len(self.queue)
+            self.queue.clear()
+            # The prefetch is already rendering this page, the cache gets it shortly
+            while self.inflight == page_number:
+                self.condition.wait()
+        image = self._render(page_number)
+        self._schedule(page_number)
+        return image
+
+    def _schedule(self, page_number: int):
+        neighbors = [page_number + i for i in range(1, self.prefetch_ahead + 1)]
+        neighbors += [page_number - i for i in range(1, self.prefetch_behind + 1)]
+        with self.condition:
+            if self.closed:
+                return
+            self.queue.extend(p for p in neighbors if 1 <= p <= self.page_count)
+            if self.worker is None:
+                self.worker = threading.Thread(target=self._prefetch, daemon=True)
+                self.worker.start()
+            self.condition.notify_all()
+
+    def _prefetch(self):
+        _lower_thread_priority()
+        while True:
+            with self.condition:
+                while not self.queue and not self.closed:
+                    self.condition.wait()
+                if self.closed:
+                    return
+                page_number = self.queue.popleft()
+                self.inflight = page_number
+            try:
+                self._render(page_number)
+                self.prefetched += 1
+            except Exception:
+                # Prefetching is best effort, a foreground request reports the error
+                pass
+            finally:
+                with self.condition:
+                    self.inflight = None
+                    self.condition.notify_all()
+
+    def close(self):
+        """Cancel the pending prefetch work and wait for the background thread"""
+        with self.condition:
+            self.closed = True
+            self.cancelled += len(self.queue)
+            self.queue.clear()
+            self.condition.notify_all()
+        if self.worker is not None:
+            self.worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def _lower_thread_priority():
+    """Lower the priority of the calling thread and of the processes it spawns"""
+    # Niceness is per thread on Linux only, elsewhere it would slow the whole process
+    get_native_id = getattr(threading, "get_native_id", None)
+    if platform.system() != "Linux" or get_native_id is None:
+        return
+    try:
+        thread_id = get_native_id()
+        niceness = os.getpriority(os.PRIO_PROCESS, thread_id) + PREFETCH_NICENESS
+        os.setpriority(os.PRIO_PROCESS, thread_id, niceness)
+    except OSError:
+        pass
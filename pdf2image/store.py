@@ -0,0 +1,124 @@
+"""
+    pdf2image compressed in-memory page store, decoded on access
+"""
+
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from typing import List, Sequence, Union
+
+from PIL import Image
+
+from pdf2image.parsers import EncodedPage, frame_format
+
+# Formats poppler writes without compression, they are re-encoded as PNG
+RAW_FORMATS = ("ppm", "pgm", "pbm", "tiff")
+# zlib level of the re-encoded pages, 1 is several times faster than the default 6
+# and still shrinks rendered pages by an order of magnitude
+COMPRESS_LEVEL = 1
+
+
+def compress_frame(data: bytes, compress_level: int = COMPRESS_LEVEL) -> bytes:
+    """Re-encode an uncompressed page as PNG, compressed pages are returned as is
+
+    :param data: Encoded page
+    :type data: bytes
+    :param compress_level: zlib compression level of the PNG, defaults to 1
+    :type compress_level: int, optional
+    :return: Encoded page
+    :rtype: bytes
+    """
+    if frame_format(data) not in RAW_FORMATS:
+        return data
+    output = BytesIO()
+    Image.open(BytesIO(data)).save(output, "PNG", compress_level=compress_level)
+    return output.getvalue()
+
+
+class CompressedPages(Sequence):
+    """Sequence of pages kept compressed in memory, returned by convert_from_path with compressed=True
+
+    It behaves like the list of images returned otherwise, but holds the pages as
+    encoded bytes (JPEG or PNG, see compress_frame) and decodes them on access. The
+    last max_decoded pages accessed are kept decoded, so a page modified in place
+    keeps its changes only until it leaves them.
+
+    :param pages: Encoded pages, uncompressed ones are compressed with compress_frame
+    :type pages: List[EncodedPage]
+    :param skipped_pages: Numbers of the blank pages left out with skip_blank, defaults to None
+    :type skipped_pages: List[int], optional
+    """
+
+    max_decoded = 4
+
+    def __init__(self, pages: List[EncodedPage], skipped_pages: List[int] = None):
+        self.pages = [
+            page
+            if page.fmt not in RAW_FORMATS
+            else EncodedPage(page.page_number, compress_frame(page.data))
+            for page in pages
+        ]
+        self.skipped_pages = skipped_pages or []
+        self.lock = threading.Lock()
+        self.decoded = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.pages)
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[Image.Image, List[Image.Image]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Page index out of range")
+        with self.lock:
+            image = self.decoded.get(index)
+            if image is not None:
+                self.decoded.move_to_end(index)
+                self.hits += 1
+                return image
+            self.misses += 1
+        image = self.pages[index].open()
+        image.load()
+        with self.lock:
+            self.decoded[index] = image
+            while len(self.decoded) > max(self.max_decoded, 1):
+                self.decoded.popitem(last=False)
+        return image
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the encoded pages"""
+        return sum(len(page) for page in self.pages)
+
+    def release(self):
+        """Drop the decoded pages"""
+        with self.lock:
+            self.decoded.clear()
+
+    def __repr__(self) -> str:
+        return "<CompressedPages {} pages {} bytes>".format(len(self), self.nbytes)
+
+
+class PageList(list):
+    """List of pages returned by convert_from_path with skip_blank=True
+
+    :param pages: Pages that were not skipped
+    :type pages: Sequence
+    :param page_numbers: Number of each page in pages
+    :type page_numbers: List[int]
+    :param skipped_pages: Numbers of the blank pages left out
+    :type skipped_pages: List[int]
+    """
+
+    def __init__(
+        self, pages: Sequence, page_numbers: List[int], skipped_pages: List[int]
+    ):
+        super().__init__(pages)
+        self.page_numbers = page_numbers
+        self.skipped_pages = skipped_pages
@@ -0,0 +1,178 @@
+"""
+    pdf2image tiled rendering of oversized pages
+"""
+
+import itertools
+import mmap
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import PurePath
+from typing import Dict, Iterator, List, Tuple, Union
+
+from PIL import Image
+
+from pdf2image.pdf2image import (
+    _document_path,
+    _page_pixel_size,
+    _pdfinfo_page_sizes,
+    convert_from_path,
+)
+
+
+def tile_grid(
+    width: int, height: int, tile_size: Union[int, Tuple[int, int]]
+) -> List[Tuple[int, int, int, int]]:
+    """Split a width x height raster in row major tiles (x, y, width, height)
+
+    :param tile_size: Size of a tile, or (width, height) of a tile, edge tiles are smaller
+    :type tile_size: Union[int, Tuple[int, int]]
+    """
+    if isinstance(tile_size, int):
+        tile_size = (tile_size, tile_size)
+    tile_width, tile_height = tile_size
+    return [
+        (x, y, min(tile_width, width - x), min(tile_height, height - y))
+        for y in range(0, height, tile_height)
+        for x in range(0, width, tile_width)
+    ]
+
+
+def _page_size(pdf_path: str, page: int, dpi: int, kwargs: Dict) -> Tuple[int, int]:
+    sizes = _pdfinfo_page_sizes(
+        pdf_path,
+        page,
+        page,
+        kwargs.get("userpw"),
+        kwargs.get("ownerpw"),
+        kwargs.get("poppler_path"),
+        kwargs.get("use_cropbox", False),
+    )
+    return _page_pixel_size(*sizes[0], dpi, None)
+
+
+def _render_tiles(
+    pdf_path: str,
+    page: int,
+    dpi: int,
+    grid: List[Tuple[int, int, int, int]],
+    thread_count: int,
+    kwargs: Dict,
+) -> Iterator[Tuple[Tuple[int, int, int, int], Image.Image]]:
+    def render(tile):
+        return convert_from_path(
+            pdf_path, dpi=dpi, first_page=page, last_page=page, region=tile, **kwargs
+        )[0]
+
+    thread_count = max(thread_count, 1)
+    tiles = iter(grid)
+    with ThreadPoolExecutor(thread_count) as executor:
+        pending = deque(
+            (tile, executor.submit(render, tile))
+            for tile in itertools.islice(tiles, thread_count)
+        )
+        while pending:
+            tile, future = pending.popleft()
+            image = future.result()
+            # Keep the pool busy while the caller handles this tile
+            for next_tile in itertools.islice(tiles, 1):
+                pending.append((next_tile, executor.submit(render, next_tile)))
+            yield tile, image
+
+
+def iter_tiles(
+    pdf: Union[str, PurePath, bytes],
+    page: int,
+    dpi: int = 200,
+    tile_size: Union[int, Tuple[int, int]] = 2048,
+    thread_count: int = 1,
+    **kwargs,
+) -> Iterator[Tuple[Tuple[int, int, int, int], Image.Image]]:
+    """Render one page as a grid of tiles, each one by its own poppler process
+
+    Up to thread_count tiles are rendered at once and at most thread_count tiles are
+    held in memory, tiles are yielded in row major order.
+
+    :param pdf: Path to the PDF, or its bytes
+    :type pdf: Union[str, PurePath, bytes]
+    :param page: Page to render, starting at 1
+    :type page: int
+    :param dpi: Image quality in DPI, defaults to 200
+    :type dpi: int, optional
+    :param tile_size: Size of a tile in pixels, or its (width, height), defaults to 2048
+    :type tile_size: Union[int, Tuple[int, int]], optional
+    :param thread_count: How many poppler processes render tiles at the same time, defaults to 1
+    :type thread_count: int, optional
+    :param kwargs: Other parameters of convert_from_path (fmt, grayscale, userpw, ...), except size
+    :return: Iterator of ((x, y, width, height), tile)
+    :rtype: Iterator[Tuple[Tuple[int, int, int, int], Image.Image]]
+    """
+    with _document_path(pdf) as pdf_path:
+        width, height = _page_size(pdf_path, page, dpi, kwargs)
+        grid = tile_grid(width, height, tile_size)
+        yield from _render_tiles(pdf_path, page, dpi, grid, thread_count, kwargs)
+
+
+def render_tiled(
+    pdf: Union[str, PurePath, bytes],
+    page: int,
+    output_path: Union[str, PurePath],
+    dpi: int = 200,
+    tile_size: Union[int, Tuple[int, int]] = 2048,
+    thread_count: int = 1,
+    grayscale: bool = False,
+    **kwargs,
+) -> str:
+    """Render one page in parallel tiles stitched into a memory-mapped PPM (PGM if grayscale) file
+
+    The page is never held in memory as a whole, the output can be read back with
+    Image.open or numpy.memmap (the pixels follow the header).
+
+    :param pdf: Path to the PDF, or its bytes
+    :type pdf: Union[str, PurePath, bytes]
+    :param page: Page to render, starting at 1
+    :type page: int
+    :param output_path: Path of the resulting file
+    :type output_path: Union[str, PurePath]
+    :param dpi: Image quality in DPI, defaults to 200
+    :type dpi: int, optional
+    :param tile_size: Size of a tile in pixels, or its (width, height), defaults to 2048
+    :type tile_size: Union[int, Tuple[int, int]], optional
+    :param thread_count: How many poppler processes render tiles at the same time, defaults to 1
+    :type thread_count: int, optional
+    :param grayscale: Output a grayscale image, defaults to False
+    :type grayscale: bool, optional
+    :param kwargs: Other parameters of convert_from_path (userpw, use_cropbox, ...), except fmt and size
+    :return: output_path
+    :rtype: str
+    """
+    if isinstance(output_path, PurePath):
+        output_path = output_path.as_posix()
+    mode, magic = ("L", "P5") if grayscale else ("RGB", "P6")
+    channels = len(mode)
+    kwargs = dict(kwargs, fmt="ppm", grayscale=grayscale)
+
+    with _document_path(pdf) as pdf_path:
+        width, height = _page_size(pdf_path, page, dpi, kwargs)
+        header = f"{magic}\n{width} {height}\n255\n".encode("ascii")
+        stride = width * channels
+        with open(output_path, "wb+") as f:
+            f.truncate(len(header) + stride * height)
+            with mmap.mmap(f.fileno(), 0) as mm:
+                mm[: len(header)] = header
+                grid = tile_grid(width, height, tile_size)
+                for (x, y, _, _), tile in _render_tiles(
+                    pdf_path, page, dpi, grid, thread_count, kwargs
+                ):
+                    if tile.mode != mode:
+                        tile = tile.convert(mode)
+                    # Poppler may round the page one pixel off our estimate, clip to it
+                    tile_width = min(tile.width, width - x)
+                    data = tile.tobytes()
+                    for row in range(min(tile.height, height - y)):
+                        offset = len(header) + (y + row) * stride + x * channels
+                        start = row * tile.width * channels
+                        mm[offset : offset + tile_width * channels] = data[
+                            start : start + tile_width * channels
+                        ]
+                mm.flush()
+    return output_path
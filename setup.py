@@ -36,7 +36,7 @@ setup(
         "Programming Language :: Python :: 3.10",
     ],
     keywords="pdf image png jpeg jpg convert",
-    packages=find_packages(exclude=["contrib", "docs", "tests"]),
+    packages=find_packages(exclude=["benchmarks", "contrib", "docs", "tests"]),
     install_requires=["pillow"],
     package_data={"pdf2image": ["py.typed"]},
 )
@@ -5,12 +5,17 @@ import pathlib
 import tempfile
 import unittest
 import time
+import zlib
 import shutil
 import subprocess
 from inspect import signature
+from io import BytesIO
 from subprocess import Popen, PIPE
 from tempfile import TemporaryDirectory
 from multiprocessing.dummy import Pool
+from unittest import mock
+
+from PIL import Image, ImageDraw
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
@@ -19,7 +24,28 @@ from pdf2image import (
     convert_from_path,
     pdfinfo_from_bytes,
     pdfinfo_from_path,
+    page_geometry_from_bytes,
+    page_geometry_from_path,
+    render_region,
+)
+import pdf2image.pdf2image
+from pdf2image import metrics
+from pdf2image.cache import PageCache, RenderCache
+from pdf2image.encode import convert_encoded, encode_frame, iter_encoded
+from pdf2image.geometry import PageGeometry
+from pdf2image.analysis import is_blank, is_grayscale
+from pdf2image.parsers import (
+    EncodedPage,
+    frame_format,
+    frame_size,
+    pbm_to_packed_array,
+    split_pbm_buffer,
 )
+from pdf2image.progressive import PREVIEW, iter_progressive
+from pdf2image.pyramid import downsample_levels, render_pyramid
+from pdf2image.session import DocumentSession
+from pdf2image.store import CompressedPages
+from pdf2image.tiles import iter_tiles, render_tiled, tile_grid
 from pdf2image.exceptions import (
     PDFInfoNotInstalledError,
     PDFPageCountError,
@@ -1763,6 +1789,985 @@ class PDFConversionMethods(unittest.TestCase):
             )
         )
 
+    @profile
+    def test_metrics_snapshot_and_prometheus(self):
+        start_time = time.time()
+        registry = metrics.MetricsRegistry(enabled=True)
+        pages = registry.counter("pages_total", "Pages", ["fmt"])
+        latency = registry.histogram("latency_seconds", "Latency", buckets=[0.1, 1])
+        pages.inc(3, fmt="ppm")
+        pages.inc(fmt="ppm")
+        latency.observe(0.05)
+        latency.observe(5)
+        snapshot = registry.snapshot()
+        self.assertEqual(snapshot["pages_total"]["samples"][0]["value"], 4)
+        self.assertEqual(
+            snapshot["latency_seconds"]["samples"][0]["buckets"],
+            {"0.1": 1, "1.0": 1, "+Inf": 2},
+        )
+        text = registry.to_prometheus()
+        self.assertIn('pages_total{fmt="ppm"} 4', text)
+        self.assertIn('latency_seconds_bucket{le="+Inf"} 2', text)
+        self.assertIn("# TYPE latency_seconds histogram", text)
+        print(
+            "test_metrics_snapshot_and_prometheus: {} sec".format(
+                time.time() - start_time
+            )
+        )
+
+    @profile
+    def test_metrics_disabled_registry_records_nothing(self):
+        start_time = time.time()
+        registry = metrics.MetricsRegistry()
+        counter = registry.counter("pages_total", "Pages")
+        counter.inc(10)
+        self.assertEqual(counter.value(), 0)
+        with self.assertRaises(ValueError):
+            registry.counter("pages_total", "Pages", ["fmt"])
+        print(
+            "test_metrics_disabled_registry_records_nothing: {} sec".format(
+                time.time() - start_time
+            )
+        )
+
+    @profile
+    @unittest.skipIf(not POPPLER_INSTALLED, "Poppler is not installed!")
+    def test_metrics_conversion_from_path(self):
+        start_time = time.time()
+        metrics.enable()
+        metrics.reset()
+        pdf2image.pdf2image._poppler_versions.clear()
+        try:
+            images_from_path = convert_from_path("./tests/test_14.pdf", thread_count=2)
+            self.assertEqual(metrics.PAGES_RENDERED.value(), 14)
+            self.assertEqual(metrics.PROCESS_SPAWNS.value(command="pdftoppm"), 3)
+            self.assertEqual(metrics.RENDER_LATENCY.count(fmt="ppm", dpi=200), 1)
+            self.assertGreater(metrics.BYTES_PRODUCED.value(), 0)
+            self.assertEqual(len(images_from_path), 14)
+        finally:
+            metrics.disable()
+            metrics.reset()
+        print(
+            "test_metrics_conversion_from_path: {} sec".format(time.time() - start_time)
+        )
+
+    @profile
+    @unittest.skipIf(not POPPLER_INSTALLED, "Poppler is not installed!")
+    def test_conversion_from_path_with_max_memory(self):
+        start_time = time.time()
+        images_from_path = convert_from_path(
+            "./tests/test_14.pdf", thread_count=4, max_memory=100 * 1024 * 1024
+        )
+        self.assertEqual(len(images_from_path), 14)
+        print(
+            "test_conversion_from_path_with_max_memory: {} sec".format(
+                time.time() - start_time
+            )
+        )
+
+    @profile
+    @unittest.skipIf(not POPPLER_INSTALLED, "Poppler is not installed!")
+    def test_conversion_from_path_with_max_memory_spills_pages(self):
+        start_time = time.time()
+        images_from_path = convert_from_path(
+            "./tests/test_14.pdf", dpi=72, thread_count=2, max_memory=1024
+        )
+        images_in_memory = convert_from_path("./tests/test_14.pdf", dpi=72)
+        self.assertEqual(len(images_from_path), 14)
+        for spilled, in_memory in zip(images_from_path, images_in_memory):
+            self.assertEqual(spilled.tobytes(), in_memory.tobytes())
+        print(
+            "test_conversion_from_path_with_max_memory_spills_pages: {} sec".format(
+                time.time() - start_time
+            )
+        )
+
+    @profile
+    @unittest.skipIf(not POPPLER_INSTALLED, "Poppler is not installed!")
+    def test_conversion_from_bytes_with_max_memory_and_pdftocairo(self):
+        start_time = time.time()
+        with open("./tests/test_14.pdf", "rb") as pdf_file:
+            images_from_bytes = convert_from_bytes(
+                pdf_file.read(), dpi=72, use_pdftocairo=True, max_memory=1024
+            )
+            self.assertEqual(len(images_from_bytes), 14)
+        print(
+            "test_conversion_from_bytes_with_max_memory_and_pdftocairo: {} sec".format(
+                time.time() - start_time
+            )
+        )
+
+    @profile
+    @unittest.skipIf(not POPPLER_INSTALLED, "Poppler is not installed!")
+    def test_conversion_from_path_with_pdftocairo_and_max_temp_disk(self):
+        start_time = time.time()
+        images_from_path = convert_from_path(
+            "./tests/test_14.pdf",
+            use_pdftocairo=True,
+            thread_count=2,
+            max_temp_disk=5 * 1024 * 1024,
+        )
+        self.assertEqual(len(images_from_path), 14)
+        [im.load() for im in images_from_path]
+        print(
+            "test_conversion_from_path_with_pdftocairo_and_max_temp_disk: {} sec".format(
+                time.time() - start_time
+            )
+        )
+
+    @profile
+    def test_render_cache_put_get_and_evict(self):
+        start_time = time.time()
+        with TemporaryDirectory() as path:
+            cache = RenderCache(path, max_size=100)
+            key = cache.key("abc", page=1, dpi=200)
+            self.assertNotEqual(key, cache.key("abc", page=1, dpi=300))
+            self.assertIsNone(cache.get(key))
+            cache.put(key, b"x" * 60)
+            self.assertEqual(cache.get(key), b"x" * 60)
+            cache.put(cache.key("abc", page=2, dpi=200), b"y" * 60)
+            # The first entry was the least recently used one
+            self.assertIsNone(cache.get(key))
+            stats = cache.stats()
+            self.assertEqual(stats["hits"], 1)
+            self.assertEqual(stats["misses"], 2)
+            self.assertEqual(stats["evictions"], 1)
+            self.assertEqual(stats["size"], 60)
+        print(
+            "test_render_cache_put_get_and_evict: {} sec".format(
+                time.time() - start_time
+            )
+        )
+
+    @profile
+    def test_render_cache_put_overwrite_keeps_size(self):
+        start_time = time.time()
+        with TemporaryDirectory() as path:
+            cache = RenderCache(path, max_size=100)
+            key = cache.key("abc", page=1, dpi=200)
+            for _ in range(3):
+                cache.put(key, b"x" * 40)
+                self.assertEqual(cache.stats()["size"], 40)
+            self.assertEqual(cache.stats()["evictions"], 0)
+            self.assertEqual(cache.get(key), b"x" * 40)
+        print(
+            "test_render_cache_put_overwrite_keeps_size: {} sec".format(
+                time.time() - start_time
+            )
+        )
+
+    @profile
+    @unittest.skipIf(not POPPLER_INSTALLED, "Poppler is not installed!")
+    def test_conversion_from_path_with_cache(self):
+        start_time = time.time()
+        with TemporaryDirectory() as path:
+            cache = RenderCache(path)
+            images_first = convert_from_path(
+                "./tests/test_14.pdf", first_page=2, last_page=4, cache=cache
+            )
+            images_second = convert_from_path(
+                "./tests/test_14.pdf", thread_count=2, cache=cache
+            )
+            self.assertEqual(len(images_second), 14)
+            self.assertEqual(cache.stats()["hits"], 3)
+            self.assertEqual(images_first[0].tobytes(), images_second[1].tobytes())
+        print(
+            "test_conversion_from_path_with_cache: {} sec".format(
+                time.time() - start_time
+            )
+        )
+
+    @profile
+    def test_page_cache_put_get_and_invalidate(self):
+        start_time = time.time()
+        cache = PageCache(max_bytes=2 * 3 * 100 * 100)
+        for page in range(1, 4):
+            cache.put(
+                str(page), Image.new("RGB", (100, 100)), "abc", "./tests/test.pdf"
+            )
+        # Byte bounded, the oldest page goes first
+        self.assertIsNone(cache.get("1"))
+        image = cache.get("2")
+        image.paste((255, 0, 0), (0, 0, 100, 100))
+        self.assertEqual(cache.get("2").getpixel((0, 0)), (0, 0, 0))
+        cache.put("4", Image.new("L", (100, 100)), "def")
+        self.assertEqual(cache.stats()["entries"], 2)
+        self.assertEqual(cache.invalidate(pdf_path="./tests/test.pdf"), 1)
+        self.assertEqual(cache.invalidate(document_hash="def"), 1)
+        self.assertEqual(cache.stats()["size"], 0)
+        print(
+            "test_page_cache_put_get_and_invalidate: {} sec".format(
+                time.time() - start_time
+            )
+        )
+
+    @profile
+    @unittest.skipIf(not POPPLER_INSTALLED, "Poppler is not installed!")
+    def test_conversion_from_path_with_page_cache(self):
+        start_time = time.time()
+        page_cache = PageCache()
+        images_first = convert_from_path(
+            "./tests/test_14.pdf", first_page=2, last_page=4, page_cache=page_cache
+        )
+        images_second = convert_from_path(
+            "./tests/test_14.pdf", last_page=5, page_cache=page_cache
+        )
+        self.assertEqual(len(images_second), 5)
+        self.assertEqual(page_cache.stats()["hits"], 3)
+        self.assertEqual(images_first[0].tobytes(), images_second[1].tobytes())
+        # A page range found in the cache does not start poppler at all
+        metrics.enable()
+        metrics.reset()
+        try:
+            images_third = convert_from_path(
+                "./tests/test_14.pdf", first_page=2, last_page=4, page_cache=page_cache
+            )
+            self.assertEqual(len(images_third), 3)
+            self.assertEqual(metrics.PROCESS_SPAWNS.samples(), [])
+        finally:
+            metrics.disable()
+            metrics.reset()
+        # Pages spilled to disk by max_memory are not decoded into the cache
+        page_cache = PageCache()
+        images = convert_from_path(
+            "./tests/test_14.pdf", dpi=72, max_memory=1024, page_cache=page_cache
+        )
+        self.assertEqual(len(images), 14)
+        self.assertEqual(page_cache.stats()["entries"], 0)
+        print(
+            "test_conversion_from_path_with_page_cache: {} sec".format(
+                time.time() - start_time
+            )
+        )
+
+    @profile
+    @unittest.skipIf(not POPPLER_INSTALLED, "Poppler is not installed!")
+    def test_conversion_from_path_lazy(self):
+        start_time = time.time()
+        pages = convert_from_path("./tests/test_14.pdf", dpi=72, lazy=True)
+        self.assertEqual(len(pages), 14)
+        self.assertFalse(any(page.rendered for page in pages))
+        self.assertEqual(pages[2].image.size, pages[2].size)
+        # The following pages were rendered in the same batch
+        self.assertEqual(
+            [page.page_number for page in pages if page.rendered],
+            list(range(3, 3 + pages.batch_size)),
+        )
+        pages.render(pages[10:12])
+        self.assertTrue(pages[11].rendered)
+        self.assertFalse(pages[12].rendered)
+        print("test_conversion_from_path_lazy: {} sec".format(time.time() - start_time))
+
+    @profile
+    @unittest.skipIf(not POPPLER_INSTALLED, "Poppler is not installed!")
+    def test_conversion_from_bytes_lazy(self):
+        start_time = time.time()
+        with open("./tests/test.pdf", "rb") as pdf_file:
+            with convert_from_bytes(
+                pdf_file.read(), size=(None, 300), lazy=True
+            ) as pages:
+                self.assertEqual(len(pages), 1)
+                self.assertEqual(pages[0].image.size, pages[0].size)
+                temp_path = pages.temp_path
+                self.assertTrue(os.path.exists(temp_path))
+            self.assertFalse(os.path.exists(temp_path))
+        print(
+            "test_conversion_from_bytes_lazy: {} sec".format(time.time() - start_time)
+        )
+
+    @profile
+    @unittest.skipIf(not POPPLER_INSTALLED, "Poppler is not installed!")
+    def test_document_session_prefetch(self):
+        start_time = time.time()
+        with DocumentSession(
+            "./tests/test_14.pdf", dpi=72, prefetch_ahead=2
+        ) as session:
+            first = session.page(1)
+            deadline = time.time() + 30
+            while session.prefetched < 2 and time.time() < deadline:
+                time.sleep(0.05)
+            self.assertEqual(session.prefetched, 2)
+            second = session.page(2)
+            self.assertEqual(session.page_cache.stats()["hits"], 1)
+            self.assertEqual(first.size, second.size)
+            with self.assertRaises(IndexError):
+                session.page(15)
+        print("test_document_session_prefetch: {} sec".format(time.time() - start_time))
+
+    @profile
+    @unittest.skipIf(not POPPLER_INSTALLED, "Poppler is not installed!")
+    def test_render_region(self):
+        start_time = time.time()
+        page = convert_from_path("./tests/test.pdf", dpi=144)[0]
+        region = render_region("./tests/test.pdf", 1, (36, 72, 108, 90), dpi=144)
+        self.assertEqual(region.size, (144, 36))
+        self.assertEqual(region.tobytes(), page.crop((72, 144, 216, 180)).tobytes())
+        with open("./tests/test.pdf", "rb") as pdf_file:
+            region = render_region(
+                pdf_file.read(), 1, (72, 144, 216, 180), dpi=144, units="px"
+            )
+        self.assertEqual(region.tobytes(), page.crop((72, 144, 216, 180)).tobytes())
+        with self.assertRaises(ValueError):
+            render_region("./tests/test.pdf", 1, (10, 10, 10, 20))
+        print("test_render_region: {} sec".format(time.time() - start_time))
+
+    @profile
+    def test_tile_grid(self):
+        start_time = time.time()
+        grid = tile_grid(250, 120, (100, 100))
+        self.assertEqual(len(grid), 6)
+        self.assertEqual(grid[2], (200, 0, 50, 100))
+        self.assertEqual(grid[-1], (200, 100, 50, 20))
+        print("test_tile_grid: {} sec".format(time.time() - start_time))
+
+    @profile
+    @unittest.skipIf(not POPPLER_INSTALLED, "Poppler is not installed!")
+    def test_render_tiled(self):
+        start_time = time.time()
+        page = convert_from_path("./tests/test.pdf", dpi=72)[0]
+        with TemporaryDirectory() as path:
+            output_path = render_tiled(
+                "./tests/test.pdf",
+                1,
+                os.path.join(path, "page.ppm"),
+                dpi=72,
+                tile_size=(300, 250),
+                thread_count=4,
+            )
+            with Image.open(output_path) as stitched:
+                self.assertEqual(stitched.size, page.size)
+                self.assertEqual(stitched.tobytes(), page.tobytes())
+        tiles = list(iter_tiles("./tests/test.pdf", 1, dpi=72, tile_size=400))
+        self.assertEqual([tile for tile, _ in tiles], tile_grid(*page.size, 400))
+        self.assertEqual(tiles[1][1].size, (212, 400))
+        print("test_render_tiled: {} sec".format(time.time() - start_time))
+
+    @profile
+    def test_downsample_levels(self):
+        start_time = time.time()
+        levels = downsample_levels(Image.new("RGB", (600, 800)), 300, [300, 72, 150])
+        self.assertEqual(list(levels), [300, 72, 150])
+        self.assertEqual(levels[150].size, (300, 400))
+        self.assertEqual(levels[72].size, (144, 192))
+        print("test_downsample_levels: {} sec".format(time.time() - start_time))
+
+    @profile
+    @unittest.skipIf(not POPPLER_INSTALLED, "Poppler is not installed!")
+    def test_render_pyramid(self):
+        start_time = time.time()
+        pages = render_pyramid(
+            "./tests/test_14.pdf", dpis=(50, 100), thread_count=2, last_page=3
+        )
+        self.assertEqual(len(pages), 3)
+        expected = convert_from_path("./tests/test_14.pdf", dpi=50, last_page=1)[0]
+        self.assertEqual(pages[0][50].size, expected.size)
+        self.assertEqual(pages[0][100].size, (2 * expected.width, 2 * expected.height))
+        print("test_render_pyramid: {} sec".format(time.time() - start_time))
+
+    @profile
+    @unittest.skipIf(not POPPLER_INSTALLED, "Poppler is not installed!")
+    def test_iter_progressive(self):
+        start_time = time.time()
+        full_pages = []
+        for page, quality, image in iter_progressive(
+            "./tests/test_14.pdf", last_page=3, dpi=72, preview_dpi=18, antialias=True
+        ):
+            if quality == PREVIEW:
+                # A preview never follows the full render of its page
+                self.assertNotIn(page, full_pages)
+                self.assertEqual(image.size, (153, 198))
+            else:
+                full_pages.append(page)
+                self.assertEqual(image.size, (612, 792))
+        self.assertEqual(sorted(full_pages), [1, 2, 3])
+        print("test_iter_progressive: {} sec".format(time.time() - start_time))
+
+    @profile
+    @unittest.skipIf(not POPPLER_INSTALLED, "Poppler is not installed!")
+    def test_conversion_from_path_without_antialias(self):
+        start_time = time.time()
+        images = convert_from_path("./tests/test.pdf", dpi=72, antialias=False)
+        self.assertEqual(images[0].size, (612, 792))
+        print(
+            "test_conversion_from_path_without_antialias: {} sec".format(
+                time.time() - start_time
+            )
+        )
+
+    @profile
+    @unittest.skipIf(not POPPLER_INSTALLED, "Poppler is not installed!")
+    def test_conversion_from_path_with_target_pixels(self):
+        start_time = time.time()
+        images = convert_from_path(
+            "./tests/test_14.pdf", last_page=3, target_pixels=500000
+        )
+        self.assertEqual(len(images), 3)
+        for image in images:
+            self.assertLessEqual(image.width * image.height, 500000)
+            self.assertGreater(image.width * image.height, 450000)
+        images = convert_from_path("./tests/test.pdf", max_dimension=1000)
+        self.assertEqual(max(images[0].size), 990)
+        print(
+            "test_conversion_from_path_with_target_pixels: {} sec".format(
+                time.time() - start_time
+            )
+        )
+
+    @profile
+    def test_page_geometry_from_pdfinfo(self):
+        start_time = time.time()
+        info = {
+            "Pages": 2,
+            "Page    1 size": "612 x 792 pts (letter)",
+            "Page    1 rot": "90",
+            "Page    1 MediaBox": "0.00 0.00 612.00 792.00",
+            "Page    1 CropBox": "10.00 20.00 310.00 420.00",
+            "Page    2 size": "200 x 100 pts",
+            "Page    2 rot": "0",
+            "Page    2 MediaBox": "0.00 0.00 200.00 100.00",
+            "Page    2 CropBox": "0.00 0.00 200.00 100.00",
+        }
+        geometry = PageGeometry.from_pdfinfo(info, 1, 2)
+        self.assertEqual(len(geometry), 2)
+        self.assertEqual(geometry.rotation(1), 90)
+        self.assertEqual(geometry.size(1), (792.0, 612.0))
+        self.assertEqual(geometry.size(1, rotated=False), (612.0, 792.0))
+        self.assertEqual(geometry.size(1, "CropBox"), (400.0, 300.0))
+        self.assertEqual(geometry.box(1, "CropBox"), (10.0, 20.0, 310.0, 420.0))
+        self.assertIsNone(geometry.box(2, "ArtBox"))
+        self.assertEqual(geometry.sizes("MediaBox"), [(792.0, 612.0), (200.0, 100.0)])
+        with self.assertRaises(IndexError):
+            geometry.size(3)
+        print(
+            "test_page_geometry_from_pdfinfo: {} sec".format(time.time() - start_time)
+        )
+
+    @profile
+    @unittest.skipIf(not POPPLER_INSTALLED, "Poppler is not installed!")
+    def test_page_geometry_from_path(self):
+        start_time = time.time()
+        geometry = page_geometry_from_path("./tests/test_14.pdf", first_page=3)
+        self.assertEqual(geometry.pages, range(3, 15))
+        self.assertEqual(geometry.size(14, "MediaBox"), (612.0, 792.0))
+        with open("./tests/test.pdf", "rb") as pdf_file:
+            geometry = page_geometry_from_bytes(pdf_file.read())
+        self.assertEqual(len(geometry), 1)
+        x0, y0, x1, y1 = geometry.box(1, "MediaBox")
+        self.assertEqual(geometry.size(1, "MediaBox"), (x1 - x0, y1 - y0))
+        print("test_page_geometry_from_path: {} sec".format(time.time() - start_time))
+
+    @profile
+    @unittest.skipIf(not POPPLER_INSTALLED, "Poppler is not installed!")
+    def test_conversion_from_path_with_extract_images(self):
+        start_time = time.time()
+        with TemporaryDirectory() as path:
+            scan_path = os.path.join(path, "scan.pdf")
+            scan = Image.new("RGB", (850, 1100), (200, 30, 30))
+            scan.save(scan_path, "PDF", resolution=100)
+            images = convert_from_path(scan_path, extract_images=True)
+            self.assertEqual(images[0].format, "JPEG")
+            self.assertEqual(images[0].size, (850, 1100))
+            # Pages without a full-page image are rendered
+            images = convert_from_path("./tests/test.pdf", dpi=72, extract_images=True)
+            self.assertEqual(images[0].format, "PPM")
+        print(
+            "test_conversion_from_path_with_extract_images: {} sec".format(
+                time.time() - start_time
+            )
+        )
+
+    @profile
+    @unittest.skipIf(not POPPLER_INSTALLED, "Poppler is not installed!")
+    def test_conversion_from_path_with_native_dpi(self):
+        start_time = time.time()
+        with TemporaryDirectory() as path:
+            scan_path = os.path.join(path, "scan.pdf")
+            Image.new("RGB", (850, 1100)).save(scan_path, "PDF", resolution=100)
+            images = convert_from_path(scan_path, dpi="native")
+            self.assertEqual(images[0].size, (850, 1100))
+            # max_dpi caps the resolution of the image
+            images = convert_from_path(scan_path, dpi="native", max_dpi=50)
+            self.assertEqual(images[0].size, (425, 550))
+        # Pages without a large image use the default resolution
+        images = convert_from_path("./tests/test.pdf", dpi="native")
+        self.assertEqual(images[0].size, (1700, 2200))
+        print(
+            "test_conversion_from_path_with_native_dpi: {} sec".format(
+                time.time() - start_time
+            )
+        )
+
+    @profile
+    @unittest.skipIf(not POPPLER_INSTALLED, "Poppler is not installed!")
+    def test_conversion_from_path_encoded(self):
+        start_time = time.time()
+        for fmt in ["ppm", "jpeg", "png", "tiff"]:
+            images = convert_from_path(
+                "./tests/test.pdf", dpi=72, fmt=fmt, grayscale=fmt == "ppm"
+            )
+            pages = convert_from_path(
+                "./tests/test.pdf",
+                dpi=72,
+                fmt=fmt,
+                grayscale=fmt == "ppm",
+                encoded=True,
+            )
+            self.assertIsInstance(pages[0], EncodedPage)
+            self.assertEqual(pages[0].page_number, 1)
+            self.assertEqual(pages[0].size, images[0].size)
+            self.assertEqual(pages[0].open().size, images[0].size)
+        self.assertEqual(pages[0].mime_type, "image/tiff")
+        with TemporaryDirectory() as path:
+            cache = RenderCache(path)
+            for _ in range(2):
+                pages = convert_from_path(
+                    "./tests/test_14.pdf",
+                    dpi=36,
+                    last_page=3,
+                    cache=cache,
+                    encoded=True,
+                )
+                self.assertEqual([p.page_number for p in pages], [1, 2, 3])
+                self.assertEqual(pages[0].fmt, "ppm")
+        print(
+            "test_conversion_from_path_encoded: {} sec".format(time.time() - start_time)
+        )
+
+    @profile
+    @unittest.skipIf(not POPPLER_INSTALLED, "Poppler is not installed!")
+    def test_conversion_from_path_compressed(self):
+        start_time = time.time()
+        images = convert_from_path("./tests/test_14.pdf", dpi=72)
+        pages = convert_from_path("./tests/test_14.pdf", dpi=72, compressed=True)
+        self.assertIsInstance(pages, CompressedPages)
+        self.assertEqual(len(pages), 14)
+        self.assertTrue(all(page.fmt == "png" for page in pages.pages))
+        self.assertLess(pages.nbytes, sum(len(image.tobytes()) for image in images))
+        for image, page in zip(images, pages):
+            self.assertEqual(image.tobytes(), page.tobytes())
+        self.assertLessEqual(len(pages.decoded), pages.max_decoded)
+        self.assertIs(pages[-1], pages[13])
+        self.assertEqual(len(pages[2:5]), 3)
+        # JPEG pages are kept as poppler wrote them
+        pages = convert_from_path(
+            "./tests/test_14.pdf", dpi=72, fmt="jpeg", last_page=2, compressed=True
+        )
+        self.assertEqual([page.fmt for page in pages.pages], ["jpeg", "jpeg"])
+        # Also when pages are rendered by nested calls, one per resolution
+        pages = convert_from_path(
+            "./tests/test_14.pdf", target_pixels=100000, last_page=3, compressed=True
+        )
+        self.assertEqual([page.fmt for page in pages.pages], ["png", "png", "png"])
+        print(
+            "test_conversion_from_path_compressed: {} sec".format(
+                time.time() - start_time
+            )
+        )
+
+    @profile
+    @unittest.skipIf(not POPPLER_INSTALLED, "Poppler is not installed!")
+    def test_conversion_from_path_encoded_png_webp(self):
+        start_time = time.time()
+        images = convert_from_path("./tests/test_14.pdf", dpi=36, last_page=5)
+        pages = convert_encoded(
+            "./tests/test_14.pdf",
+            dpi=36,
+            last_page=5,
+            thread_count=2,
+            encode_thread_count=2,
+            batch_size=2,
+        )
+        self.assertEqual([page.page_number for page in pages], [1, 2, 3, 4, 5])
+        for image, page in zip(images, pages):
+            self.assertEqual(page.fmt, "png")
+            self.assertEqual(page.open().tobytes(), image.tobytes())
+        with open("./tests/test_14.pdf", "rb") as pdf_file:
+            pages = list(
+                iter_encoded(
+                    pdf_file.read(), codec="webp", lossless=True, dpi=36, first_page=14
+                )
+            )
+        self.assertEqual(len(pages), 1)
+        self.assertEqual((pages[0].fmt, pages[0].mime_type), ("webp", "image/webp"))
+        self.assertEqual(pages[0].size, images[0].size)
+        with self.assertRaises(ValueError):
+            encode_frame(pages[0].data, codec="gif")
+        print(
+            "test_conversion_from_path_encoded_png_webp: {} sec".format(
+                time.time() - start_time
+            )
+        )
+
+    @profile
+    @unittest.skipIf(not POPPLER_INSTALLED, "Poppler is not installed!")
+    def test_conversion_from_path_to_pbm(self):
+        start_time = time.time()
+        images = convert_from_path(
+            "./tests/test_14.pdf", dpi=50, fmt="pbm", thread_count=4, max_memory=10**6
+        )
+        self.assertEqual(len(images), 14)
+        self.assertTrue(all(image.mode == "1" for image in images))
+        with TemporaryDirectory() as path:
+            paths = convert_from_path(
+                "./tests/test_14.pdf",
+                dpi=50,
+                fmt="mono",
+                last_page=2,
+                output_folder=path,
+                paths_only=True,
+            )
+            self.assertTrue(all(p.endswith(".pbm") for p in paths))
+        pages = convert_from_path(
+            "./tests/test_14.pdf", dpi=50, fmt="pbm", last_page=1, encoded=True
+        )
+        self.assertEqual(pages[0].fmt, "pbm")
+        self.assertEqual(pages[0].size, images[0].size)
+        try:
+            # Rows of 425 pixels take 54 bytes
+            self.assertEqual(pbm_to_packed_array(pages[0].data).shape, (550, 54))
+        except ImportError:
+            pass
+        with self.assertRaises(NotImplementedError):
+            convert_from_path("./tests/test.pdf", fmt="pbm", use_pdftocairo=True)
+        print(
+            "test_conversion_from_path_to_pbm: {} sec".format(time.time() - start_time)
+        )
+
+    @profile
+    @unittest.skipIf(not POPPLER_INSTALLED, "Poppler is not installed!")
+    def test_conversion_from_path_with_quality_preset(self):
+        start_time = time.time()
+        sizes = set()
+        for quality in ["draft", "normal", "high"]:
+            for use_pdftocairo in [False, True]:
+                images = convert_from_path(
+                    "./tests/test.pdf",
+                    dpi=72,
+                    quality=quality,
+                    use_pdftocairo=use_pdftocairo,
+                )
+                sizes.add(images[0].size)
+        self.assertEqual(len(sizes), 1)
+        # antialias=False is the draft quality
+        self.assertEqual(
+            convert_from_path("./tests/test.pdf", dpi=72, antialias=False)[0].tobytes(),
+            convert_from_path("./tests/test.pdf", dpi=72, quality="draft")[0].tobytes(),
+        )
+        with self.assertRaises(ValueError):
+            convert_from_path("./tests/test.pdf", quality="best")
+        with self.assertRaises(ValueError):
+            convert_from_path("./tests/test.pdf", antialias=False, quality="high")
+        print(
+            "test_conversion_from_path_with_quality_preset: {} sec".format(
+                time.time() - start_time
+            )
+        )
+
+    @profile
+    @unittest.skipIf(not POPPLER_INSTALLED, "Poppler is not installed!")
+    def test_conversion_from_path_with_auto_grayscale(self):
+        start_time = time.time()
+        with TemporaryDirectory() as path:
+            pdf_path = os.path.join(path, "mixed.pdf")
+            gray = Image.new("RGB", (200, 300), (120, 120, 120))
+            color = Image.new("RGB", (200, 300), (200, 30, 30))
+            gray.save(pdf_path, "PDF", save_all=True, append_images=[color, gray])
+            images = convert_from_path(pdf_path, dpi=72, auto_grayscale=True)
+            self.assertEqual([image.mode for image in images], ["L", "RGB", "L"])
+            self.assertEqual(images[0].getpixel((10, 10)), 120)
+            # Also with the nested calls rendering pages at their own resolution
+            images = convert_from_path(pdf_path, dpi="native", auto_grayscale=True)
+            self.assertEqual([image.mode for image in images], ["L", "RGB", "L"])
+            images = convert_from_path(
+                pdf_path, dpi=72, grayscale=True, auto_grayscale=True
+            )
+            self.assertEqual([image.mode for image in images], ["L", "L", "L"])
+            # Pages spilled under the memory budget stay in their temporary files
+            images = convert_from_path(
+                pdf_path, dpi=72, max_memory=1, auto_grayscale=True
+            )
+            self.assertEqual([image.mode for image in images], ["L", "RGB", "L"])
+            self.assertTrue(all(getattr(image, "fp", None) for image in images))
+        print(
+            "test_conversion_from_path_with_auto_grayscale: {} sec".format(
+                time.time() - start_time
+            )
+        )
+
+    @profile
+    @unittest.skipIf(not POPPLER_INSTALLED, "Poppler is not installed!")
+    def test_conversion_from_path_with_skip_blank(self):
+        start_time = time.time()
+        with TemporaryDirectory() as path:
+            pdf_path = os.path.join(path, "separators.pdf")
+            text = Image.new("RGB", (612, 792), "white")
+            ImageDraw.Draw(text).text((50, 50), "TEST TEST TEST", fill="black")
+            # A scanned separator, paper with light noise
+            scan = Image.effect_noise((612, 792), 4).point(lambda v: 245 + v % 10)
+            text.save(
+                pdf_path,
+                "PDF",
+                save_all=True,
+                append_images=[scan.convert("RGB"), text],
+            )
+            images = convert_from_path(pdf_path, dpi=72, skip_blank=True)
+            self.assertEqual(len(images), 2)
+            self.assertEqual(images.page_numbers, [1, 3])
+            self.assertEqual(images.skipped_pages, [2])
+            pages = convert_from_path(
+                pdf_path, dpi=72, first_page=2, skip_blank=True, encoded=True
+            )
+            self.assertEqual([page.page_number for page in pages], [3])
+        images = convert_from_path("./tests/test.pdf", skip_blank=True)
+        self.assertEqual(images.skipped_pages, [])
+        # An empty page range is still a PageList
+        images = convert_from_path(
+            "./tests/test_14.pdf", first_page=5, last_page=3, skip_blank=True
+        )
+        self.assertEqual(images, [])
+        self.assertEqual((images.page_numbers, images.skipped_pages), ([], []))
+        images = convert_from_path(
+            "./tests/test.pdf", first_page=2, skip_blank=True, compressed=True
+        )
+        self.assertEqual((len(images), images.skipped_pages), (0, []))
+        print(
+            "test_conversion_from_path_with_skip_blank: {} sec".format(
+                time.time() - start_time
+            )
+        )
+
+    @profile
+    @unittest.skipIf(not POPPLER_INSTALLED, "Poppler is not installed!")
+    def test_conversion_from_path_with_extract_images_cmyk_jpeg(self):
+        start_time = time.time()
+        with TemporaryDirectory() as path:
+            scan_path = os.path.join(path, "cmyk.pdf")
+            Image.new("CMYK", (300, 400), (0, 200, 200, 0)).save(
+                scan_path, "PDF", resolution=100
+            )
+            # CMYK pages are rendered instead, like the RGB pages around them
+            images = convert_from_path(scan_path, dpi=100, extract_images=True)
+            self.assertEqual(images[0].mode, "RGB")
+            pages = convert_from_path(
+                scan_path, dpi=100, extract_images=True, compressed=True
+            )
+            self.assertEqual(pages[0].mode, "RGB")
+        print(
+            "test_conversion_from_path_with_extract_images_cmyk_jpeg: {} sec".format(
+                time.time() - start_time
+            )
+        )
+
+    @profile
+    @unittest.skipIf(not POPPLER_INSTALLED, "Poppler is not installed!")
+    def test_conversion_from_path_with_extract_images_cmyk_raw(self):
+        start_time = time.time()
+        with TemporaryDirectory() as path:
+            scan_path = os.path.join(path, "cmyk.pdf")
+            # A page drawing one Flate compressed DeviceCMYK image, written by hand
+            # since Pillow only embeds CMYK images as JPEG
+            pixels = zlib.compress(bytes([0, 200, 200, 0]) * 300 * 400)
+            content = b"q 216 0 0 288 0 0 cm /Im0 Do Q"
+            objects = [
+                b"<< /Type /Catalog /Pages 2 0 R >>",
+                b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+                b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 216 288] "
+                b"/Resources << /XObject << /Im0 4 0 R >> >> /Contents 5 0 R >>",
+                b"<< /Type /XObject /Subtype /Image /Width 300 /Height 400 "
+                b"/ColorSpace /DeviceCMYK /BitsPerComponent 8 /Filter /FlateDecode "
+                b"/Length %d >>\nstream\n" % len(pixels) + pixels + b"\nendstream",
+                b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream",
+            ]
+            data = b"%PDF-1.4\n"
+            offsets = []
+            for number, obj in enumerate(objects, 1):
+                offsets.append(len(data))
+                data += b"%d 0 obj\n" % number + obj + b"\nendobj\n"
+            xref = len(data)
+            data += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+            data += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+            data += b"trailer\n<< /Size %d /Root 1 0 R >>\n" % (len(objects) + 1)
+            data += b"startxref\n%d\n%%%%EOF\n" % xref
+            with open(scan_path, "wb") as f:
+                f.write(data)
+            images = convert_from_path(scan_path, dpi=100, extract_images=True)
+            self.assertEqual(images[0].mode, "RGB")
+            self.assertEqual(images[0].size, (300, 400))
+            pages = convert_from_path(
+                scan_path, dpi=100, extract_images=True, compressed=True
+            )
+            self.assertEqual(pages.pages[0].fmt, "png")
+        print(
+            "test_conversion_from_path_with_extract_images_cmyk_raw: {} sec".format(
+                time.time() - start_time
+            )
+        )
+
+    @profile
+    @unittest.skipIf(not POPPLER_INSTALLED, "Poppler is not installed!")
+    def test_conversion_from_path_with_target_pixels_and_thread_count(self):
+        start_time = time.time()
+        metrics.enable()
+        metrics.reset()
+        pdf2image.pdf2image._poppler_versions.clear()
+        try:
+            images = convert_from_path(
+                "./tests/test_14.pdf", target_pixels=500000, thread_count=2
+            )
+            self.assertEqual(len(images), 14)
+            # Page count and poppler version are not looked up again by the runs
+            self.assertEqual(metrics.PROCESS_SPAWNS.value(command="pdfinfo"), 2)
+            self.assertEqual(metrics.PROCESS_SPAWNS.value(command="pdftoppm"), 3)
+        finally:
+            metrics.disable()
+            metrics.reset()
+        self.assertEqual(
+            [image.size for image in images],
+            [
+                image.size
+                for image in convert_from_path(
+                    "./tests/test_14.pdf", target_pixels=500000
+                )
+            ],
+        )
+        print(
+            "test_conversion_from_path_with_target_pixels_and_thread_count: {} sec".format(
+                time.time() - start_time
+            )
+        )
+
+    @profile
+    @unittest.skipIf(not POPPLER_INSTALLED, "Poppler is not installed!")
+    def test_conversion_from_path_with_pdftocairo_sizes_temp_dir(self):
+        start_time = time.time()
+        with mock.patch.object(
+            pdf2image.pdf2image,
+            "_make_auto_temp_dir",
+            wraps=pdf2image.pdf2image._make_auto_temp_dir,
+        ) as make_auto_temp_dir:
+            images_from_path = convert_from_path(
+                "./tests/test.pdf", dpi=72, use_pdftocairo=True
+            )
+            self.assertEqual(len(images_from_path), 1)
+            if os.path.isdir(pdf2image.pdf2image.TMPFS_DIR):
+                # Decoded size of the 612x792 RGB page
+                make_auto_temp_dir.assert_called_once_with(612 * 792 * 3)
+        print(
+            "test_conversion_from_path_with_pdftocairo_sizes_temp_dir: {} sec".format(
+                time.time() - start_time
+            )
+        )
+
+    @profile
+    @unittest.skipIf(not POPPLER_INSTALLED, "Poppler is not installed!")
+    def test_conversion_from_path_with_max_memory_counts_stdout_twice(self):
+        start_time = time.time()
+        page_bytes = 612 * 792 * 3
+        metrics.enable()
+        metrics.reset()
+        pdf2image.pdf2image._poppler_versions.clear()
+        try:
+            # Half of the budget is in flight, room for 4 pages or 2 pages read from a pipe
+            images_from_path = convert_from_path(
+                "./tests/test_14.pdf", dpi=72, max_memory=8 * page_bytes
+            )
+            self.assertEqual(len(images_from_path), 14)
+            # 7 chunks and the version check
+            self.assertEqual(metrics.PROCESS_SPAWNS.value(command="pdftoppm"), 8)
+        finally:
+            metrics.disable()
+            metrics.reset()
+        print(
+            "test_conversion_from_path_with_max_memory_counts_stdout_twice: {} sec".format(
+                time.time() - start_time
+            )
+        )
+
+    @profile
+    def test_is_grayscale(self):
+        start_time = time.time()
+        image = Image.new("RGB", (40, 30), (120, 122, 124))
+        self.assertTrue(is_grayscale(image))
+        image.putpixel((5, 5), (200, 30, 30))
+        self.assertFalse(is_grayscale(image))
+        self.assertFalse(is_grayscale(Image.new("L", (40, 30), 120)))
+        print("test_is_grayscale: {} sec".format(time.time() - start_time))
+
+    @profile
+    def test_is_blank(self):
+        start_time = time.time()
+        self.assertTrue(is_blank(Image.new("L", (200, 300), 255)))
+        # Tinted paper is still blank
+        self.assertTrue(is_blank(Image.new("L", (200, 300), 210)))
+        page = Image.new("L", (200, 300), 255)
+        ImageDraw.Draw(page).line((20, 40, 180, 40), fill=0, width=2)
+        self.assertFalse(is_blank(page))
+        print("test_is_blank: {} sec".format(time.time() - start_time))
+
+    @profile
+    def test_split_pbm_buffer(self):
+        start_time = time.time()
+        frames = []
+        for size in [(37, 23), (16, 9)]:
+            image = Image.new("1", size, 1)
+            ImageDraw.Draw(image).line((0, 0) + size, fill=0)
+            output = BytesIO()
+            image.save(output, "PPM")
+            frames.append(output.getvalue())
+        self.assertEqual(split_pbm_buffer(b"".join(frames)), frames)
+        print("test_split_pbm_buffer: {} sec".format(time.time() - start_time))
+
+    @profile
+    def test_frame_size(self):
+        start_time = time.time()
+        Image.init()
+        for fmt, mode, pil_fmt in [
+            ("ppm", "RGB", "PPM"),
+            ("pgm", "L", "PPM"),
+            ("pbm", "1", "PPM"),
+            ("jpeg", "RGB", "JPEG"),
+            ("png", "RGB", "PNG"),
+            ("tiff", "RGB", "TIFF"),
+            ("webp", "RGB", "WEBP"),
+        ]:
+            if pil_fmt not in Image.SAVE:
+                continue
+            output = BytesIO()
+            Image.new(mode, (37, 23)).save(output, pil_fmt)
+            self.assertEqual(frame_format(output.getvalue()), fmt)
+            self.assertEqual(frame_size(output.getvalue()), (37, 23))
+        print("test_frame_size: {} sec".format(time.time() - start_time))
+
+    @profile
+    @unittest.skipIf(not POPPLER_INSTALLED, "Poppler is not installed!")
+    def test_conversion_from_path_single_file_nested_calls(self):
+        start_time = time.time()
+        options = [
+            {"lazy": True},
+            {"skip_blank": True},
+            {"target_pixels": 100000},
+            {"skip_blank": True, "use_pdftocairo": True},
+        ]
+        for kwargs in options:
+            with TemporaryDirectory() as path:
+                images = convert_from_path(
+                    "./tests/test_14.pdf",
+                    dpi=36,
+                    output_folder=path,
+                    single_file=True,
+                    output_file="single",
+                    **kwargs,
+                )
+                self.assertEqual(len(images), 1)
+                image = images[0].image if kwargs.get("lazy") else images[0]
+                image.load()
+                self.assertTrue(os.path.basename(image.filename).startswith("single"))
+        print(
+            "test_conversion_from_path_single_file_nested_calls: {} sec".format(
+                time.time() - start_time
+            )
+        )
+
 
 if __name__ == "__main__":
     unittest.main()